@@ -15,6 +15,7 @@ Usage:
     python process_pipeline.py --step 3         # Run only step 3 (enrichment)
     python process_pipeline.py --step 4         # Run only step 4 (login data)
     python process_pipeline.py --skip-api        # Skip API-dependent steps (step 2)
+    python process_pipeline.py --no-resume       # Re-verify emails already verified by a previous step 2 run
     python process_pipeline.py --skip-bq         # Skip BigQuery-dependent steps (step 3)
 """
 
@@ -22,13 +23,23 @@ import csv
 import os
 import sys
 import argparse
+import asyncio
+import atexit
 import concurrent.futures
-import requests
-import json
+import hashlib
+import itertools
+import threading
+import time
+import aiohttp
+import orjson
 import re
 import logging
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from google.cloud import bigquery
-import difflib
+from rapidfuzz import fuzz, process
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -43,19 +54,48 @@ INPUT_FILE = 'View Users 251216 - DataIQ Users (2).csv'
 LOGIN_DATA_FILE = 'View Product Last Login Data.csv'
 
 # Intermediate files
-STEP1_OUTPUT = 'verified_emails_output.csv'
-STEP2_OUTPUT = 'cleaned view user list.csv'
+# Intermediate outputs of steps 1 and 2 are Parquet (all columns stored as strings)
+STEP1_OUTPUT = 'verified_emails_output.parquet'
+STEP2_OUTPUT = 'cleaned view user list.parquet'
 STEP3_OUTPUT = 'cleaned view user list_enriched.csv'
 FINAL_OUTPUT = 'final_complete_results.csv'
+CSV_WRITE_BUFFER_SIZE = 1024 * 1024  # Bytes buffered before each write to the CSV outputs
 
 # API Configuration
 API_URL = "http://localhost:8080/api/validate"
+API_BATCH_URL = f"{API_URL}/batch"
 MAX_WORKERS = 20
 BATCH_TIMEOUT = 10
+VALIDATION_BATCH_SIZE = 200  # Emails sent per batch validation request
+STEP2_CHUNK_SIZE = 5000  # Rows read and verified at a time in step 2
+
+# Step 3 enrichment parallelism (rows are enriched in chunks across processes)
+STEP3_WORKERS = os.cpu_count() or 1
+STEP3_CHUNK_SIZE = 1000
+FACILITY_MATCH_MAX_CELLS = 5_000_000  # Score matrix cells per rapidfuzz cdist call (float32, ~20 MB)
 
 # BigQuery Configuration
 BQ_PROJECT_ID = 'gen-lang-client-0844868008'
 BQ_LIST_ID = '901302721443'  # Corporations list ID
+BQ_PAGE_SIZE = 10000  # Rows per page when fetching results (fewer REST round-trips)
+BQ_CACHE_DIR = '.bq_cache'  # Local Parquet copies of slow-changing BigQuery lookups
+
+def _env_int(name, default):
+    """Integer value of environment variable name, or default if unset or malformed."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}; using {default}")
+        return default
+
+BQ_CACHE_TTL = _env_int('BQ_CACHE_TTL', 3600)  # Seconds a cached copy stays fresh; 0 disables
+
+# ClickUp org code categorization parallelism (tasks are classified in chunks across processes)
+ORG_CODE_WORKERS = os.cpu_count() or 1
+ORG_CODE_CHUNK_SIZE = 500
 
 # Exclusion lists - org codes and corporation names to exclude
 # - NEX and CSNHC are already cross-sold
@@ -82,54 +122,79 @@ CORP_NAME_ALIASES = {
     'Judson Village': 'Hillstone'
 }
 
+# Uppercase versions of the above, for case-insensitive lookups in the row loops
+_EXCLUDED_UPPER = frozenset(ex.upper() for ex in EXCLUDED_CORPORATIONS)
+_ORG_ALIASES_UPPER = {k.upper(): v.upper() for k, v in ORG_CODE_ALIASES.items()}
+_CORP_ALIASES_UPPER = {k.upper(): v.upper() for k, v in CORP_NAME_ALIASES.items()}
 
-def get_org_codes_from_clickup():
-    """
-    Query ClickUp to dynamically determine org codes and campaign categories:
-    
-    1. VIEW_CLINICAL_ORG_CODES (View Clinical - Labor + Flow expansion):
-       - Customer Type = "View"
-       - Services NOT equal to "Labor" AND NOT equal to "QRM"
-       - Status = "active"
+# Separators between the org codes in a ClickUp "Org Code" label (e.g. "ABC, DEF/GHI")
+_ORG_CODE_SPLIT = re.compile(r'[,\-/\s]+')
+
+# Shared BigQuery client, created on first use and closed at exit
+_bq_client = None
+_bq_client_lock = threading.Lock()
+
+
+def get_bq_client():
+    """Return the BigQuery client shared by every query in the pipeline.
     
-    2. QRM_CADENCE_ORG_CODES (Corporate Cadence for QRM customers):
-       - Customer Type = "View"
-       - Services = "QRM" (and NOT "Labor")
-       - Status = "active"
+    Reusing one client keeps its credentials and HTTP connection pool warm
+    across queries instead of bootstrapping a new one per call. It is safe to
+    use from the HubSpot contacts worker threads.
+    """
+    global _bq_client
+    with _bq_client_lock:
+        if _bq_client is None:
+            _bq_client = bigquery.Client(project=BQ_PROJECT_ID)
+            atexit.register(_bq_client.close)
+    return _bq_client
+
+
+def _cached_arrow(key, fetch, refresh=False):
+    """Return the Arrow table for key from the local cache, or fetch() and cache it.
     
-    3. OTHER_ACTIVE_ORG_CODES (All other active corporations):
-       - Customer Type = "View"
-       - Status = "active" OR "implementation"
+    The ClickUp task and HubSpot company lookups change slowly, so repeated runs
+    within BQ_CACHE_TTL seconds reuse a local Parquet copy instead of querying
+    BigQuery again. refresh=True skips the cached copy and replaces it. An
+    unreadable cache file is refetched; a failed write only logs a warning.
+    """
+    if BQ_CACHE_TTL <= 0:
+        return fetch()
     
-    4. LOSING_ACCESS_QRM_ORG_CODES (Losing access to QRM reports):
-       - Sales Outreach Campaign = "Pitch SNF Metrics (QRM Downsell)"
-       - Customer Type = "View"
-       - Status = "active"
+    path = os.path.join(BQ_CACHE_DIR, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.parquet')
+    try:
+        if not refresh and time.time() - os.path.getmtime(path) < BQ_CACHE_TTL:
+            return pq.read_table(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable BigQuery cache {path}: {e}")
     
-    5. CORPORATE_CADENCE_LABOR_ORG_CODES (Corporate Cadence for customers who pay for labor reports):
-       - Customer Type = "View"
-       - Services includes "Labor"
-       - Status = "active"
+    table = fetch()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(BQ_CACHE_DIR, exist_ok=True)
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not write BigQuery cache {path}: {e}")
+    return table
+
+
+def _field_options(field):
+    """Returns the options list of a ClickUp dropdown/labels custom field (empty if none)."""
+    return (field.get('type_config') or {}).get('options') or ()
+
+def _classify_clickup_tasks(tasks):
+    """Sorts the org codes of ClickUp tasks into campaign categories.
     
-    Returns:
-        - view_clinical_orgs: set of org codes for View Clinical
-        - qrm_cadence_orgs: set of org codes for QRM Cadence
-        - other_active_orgs: set of org codes for Other Active
-        - losing_access_qrm_orgs: set of org codes for Losing access to QRM reports
-        - corporate_cadence_labor_orgs: set of org codes for Corporate Cadence (Labor)
-    """
-    client = bigquery.Client(project=BQ_PROJECT_ID)
+    Args:
+        tasks: (status, custom_fields) pairs as returned by BigQuery.
     
-    query = f"""
-        SELECT id, name, status, custom_fields
-        FROM `gen-lang-client-0844868008.ClickUp_AirbyteCustom.task`
-        WHERE JSON_VALUE(list, '$.id') = '{BQ_LIST_ID}'
+    Returns the six category sets in get_org_codes_from_clickup's order, before
+    codes in another campaign are removed from View Clinical. Module-level so
+    chunks of tasks can be classified in worker processes.
     """
-    
-    logger.info("Querying ClickUp for org code categorization...")
-    query_job = client.query(query)
-    results = query_job.result()
-    
     view_clinical_orgs = set()   # View + NOT Labor + NOT QRM + active
     qrm_cadence_orgs = set()    # View + QRM + NOT Labor + active
     other_active_orgs = set()    # View + active
@@ -137,16 +202,26 @@ def get_org_codes_from_clickup():
     losing_access_qrm_orgs = set()  # Losing access to QRM reports
     corporate_cadence_labor_orgs = set()  # Corporate Cadence for Labor
     
-    for row in results:
-        task_id = row.id
-        task_name = row.name
-        status_json = row.status
+    # Option ID -> label maps by custom field ID. Every task in the list
+    # carries the same options for a field, so each map is built once.
+    label_maps = {}
+    
+    def id_to_label_for(field):
+        field_id = field.get('id')
+        id_to_label = label_maps.get(field_id)
+        if id_to_label is None:
+            id_to_label = {opt.get('id', ''): opt.get('label', '') for opt in _field_options(field)}
+            if field_id is not None:
+                label_maps[field_id] = id_to_label
+        return id_to_label
+    
+    for status_json, cfields_raw in tasks:
         
         # Parse status
         status_val = 'unknown'
         if isinstance(status_json, str):
             try:
-                s_dict = json.loads(status_json)
+                s_dict = orjson.loads(status_json)
                 status_val = s_dict.get('status', '').lower()
             except:
                 pass
@@ -154,23 +229,27 @@ def get_org_codes_from_clickup():
             status_val = status_json.get('status', '').lower()
         
         # Parse custom fields
-        cfields_raw = row.custom_fields
         cfields = []
         if isinstance(cfields_raw, str):
             try:
-                cfields = json.loads(cfields_raw)
+                cfields = orjson.loads(cfields_raw)
             except:
                 continue
         elif isinstance(cfields_raw, list):
             cfields = cfields_raw
         
+        # Index custom fields by name once (first occurrence wins)
+        field_by_name = {}
+        for f in cfields:
+            field_by_name.setdefault(f.get('name'), f)
+        
         # Extract Customer Type
         # The value can be an integer (orderindex) or a string ID
         customer_type = ''
-        customer_type_field = next((f for f in cfields if f.get('name') == 'Customer Type'), None)
+        customer_type_field = field_by_name.get('Customer Type')
         if customer_type_field:
             value = customer_type_field.get('value', None)
-            options = customer_type_field.get('type_config', {}).get('options', [])
+            options = _field_options(customer_type_field)
             
             if value is not None:
                 # Check if value is an orderindex (integer) - look up by orderindex
@@ -197,33 +276,25 @@ def get_org_codes_from_clickup():
         
         # Extract Services - value is an array of service IDs
         services = set()
-        services_field = next((f for f in cfields if f.get('name') == 'Services'), None)
+        services_field = field_by_name.get('Services')
         if services_field:
             service_value = services_field.get('value', [])
-            type_config = services_field.get('type_config', {})
             
             if isinstance(service_value, list):
-                # Build a lookup from ID to label
-                id_to_label = {}
-                for opt in type_config.get('options', []):
-                    id_to_label[opt.get('id', '')] = opt.get('label', '').lower()
-                
+                id_to_label = id_to_label_for(services_field)
                 for service_id in service_value:
                     label = id_to_label.get(service_id, '')
                     if label:
-                        services.add(label)
+                        services.add(label.lower())
             elif isinstance(service_value, str) and service_value:
                 # Single value
-                id_to_label = {}
-                for opt in type_config.get('options', []):
-                    id_to_label[opt.get('id', '')] = opt.get('label', '').lower()
-                label = id_to_label.get(service_value, '')
+                label = id_to_label_for(services_field).get(service_value, '')
                 if label:
-                    services.add(label)
+                    services.add(label.lower())
         
         # Extract Sales Outreach Campaign (type is "labels" - value is an array of label IDs)
         sales_outreach_campaigns = []
-        sales_outreach_field = next((f for f in cfields if f.get('name') == 'Sales Outreach Campaign'), None)
+        sales_outreach_field = field_by_name.get('Sales Outreach Campaign')
         if sales_outreach_field:
             # For labels type, value is an array of label IDs
             value = sales_outreach_field.get('value', [])
@@ -232,23 +303,19 @@ def get_org_codes_from_clickup():
             elif not isinstance(value, list):
                 value = []
             
-            # Build lookup from ID to label name
-            id_to_label = {}
-            for opt in sales_outreach_field.get('type_config', {}).get('options', []):
-                id_to_label[opt.get('id', '')] = opt.get('label', '').lower()
-            
             # Get all selected label names
+            id_to_label = id_to_label_for(sales_outreach_field)
             for label_id in value:
                 label = id_to_label.get(label_id, '')
                 if label:
-                    sales_outreach_campaigns.append(label)
+                    sales_outreach_campaigns.append(label.lower())
         
         # Check for "Pitch SNF Metrics (QRM Downsell)" - case insensitive partial match
         is_qrm_downsell = any('pitch snf metrics' in camp or 'qrm downsell' in camp for camp in sales_outreach_campaigns)
         
         # Extract Org Codes - value is an array of org code IDs
         org_codes = set()
-        field = next((f for f in cfields if f.get('name') == 'Org Code'), None)
+        field = field_by_name.get('Org Code')
         if not field:
             continue
         
@@ -261,27 +328,18 @@ def get_org_codes_from_clickup():
         elif not isinstance(value_ids, list):
             value_ids = [value_ids]
         
-        # Build lookup from ID to label
-        options = field.get('type_config', {}).get('options', [])
-        id_to_label = {}
-        for opt in options:
-            id_to_label[opt.get('id', '')] = opt.get('label', '')
-        
+        id_to_label = id_to_label_for(field)
         for val in value_ids:
             label = id_to_label.get(val, '')
             if label:
-                # Normalize and extract individual words as org codes
-                normalized = label.replace(',', ' ').replace('-', ' ').replace('/', ' ')
-                words = normalized.split()
-                for word in words:
-                    clean_code = word.strip().upper()
-                    if clean_code and not clean_code.startswith('<') and len(clean_code) > 1:
-                        org_codes.add(clean_code)
+                # Extract individual words as org codes
+                for word in _ORG_CODE_SPLIT.split(label):
+                    if len(word) > 1 and not word.startswith('<'):
+                        org_codes.add(word.upper())
         
         # Determine category based on criteria
         has_labor = 'labor' in services
-        has_qrm = 'qrm' in services
-        has_mds = 'mds' in services
+        is_qrm_mds_only = services == {'qrm', 'mds'}
         is_active = status_val == 'active'
         is_implementation = status_val == 'implementation'
         
@@ -293,13 +351,11 @@ def get_org_codes_from_clickup():
             elif has_labor and is_active:
                 corporate_cadence_labor_orgs.add(org_code)
             # Corporate Cadence for QRM MDS customers: View + ONLY QRM + MDS (no other services) + active
-            elif has_qrm and has_mds and len(services) == 2 and is_active:
+            elif is_qrm_mds_only and is_active:
                 qrm_cadence_orgs.add(org_code)
-            # View Clinical: View + active + NOT in any other campaign (QRM MDS or Losing Access QRM)
+            # View Clinical: View + active (codes in another campaign are removed below)
             elif is_active:
-                # Only add to View Clinical if not already in another campaign
-                if org_code not in losing_access_qrm_orgs and org_code not in corporate_cadence_labor_orgs and org_code not in qrm_cadence_orgs:
-                    view_clinical_orgs.add(org_code)
+                view_clinical_orgs.add(org_code)
             # In Implementation: View + implementation status
             elif is_implementation:
                 in_implementation_orgs.add(org_code)
@@ -307,6 +363,87 @@ def get_org_codes_from_clickup():
             elif is_active:
                 other_active_orgs.add(org_code)
     
+    return view_clinical_orgs, qrm_cadence_orgs, other_active_orgs, in_implementation_orgs, losing_access_qrm_orgs, corporate_cadence_labor_orgs
+
+def get_org_codes_from_clickup():
+    """
+    Query ClickUp to dynamically determine org codes and campaign categories:
+    
+    1. VIEW_CLINICAL_ORG_CODES (View Clinical - Labor + Flow expansion):
+       - Customer Type = "View"
+       - Services NOT equal to "Labor" AND NOT equal to "QRM"
+       - Status = "active"
+    
+    2. QRM_CADENCE_ORG_CODES (Corporate Cadence for QRM customers):
+       - Customer Type = "View"
+       - Services = "QRM" (and NOT "Labor")
+       - Status = "active"
+    
+    3. OTHER_ACTIVE_ORG_CODES (All other active corporations):
+       - Customer Type = "View"
+       - Status = "active" OR "implementation"
+    
+    4. LOSING_ACCESS_QRM_ORG_CODES (Losing access to QRM reports):
+       - Sales Outreach Campaign = "Pitch SNF Metrics (QRM Downsell)"
+       - Customer Type = "View"
+       - Status = "active"
+    
+    5. CORPORATE_CADENCE_LABOR_ORG_CODES (Corporate Cadence for customers who pay for labor reports):
+       - Customer Type = "View"
+       - Services includes "Labor"
+       - Status = "active"
+    
+    Returns:
+        - view_clinical_orgs: set of org codes for View Clinical
+        - qrm_cadence_orgs: set of org codes for QRM Cadence
+        - other_active_orgs: set of org codes for Other Active
+        - losing_access_qrm_orgs: set of org codes for Losing access to QRM reports
+        - corporate_cadence_labor_orgs: set of org codes for Corporate Cadence (Labor)
+    """
+    client = get_bq_client()
+    
+    # Every category requires Customer Type "View" and an active or
+    # implementation status, so filter on both server-side. The loop below
+    # still classifies each returned task exactly.
+    query = """
+        SELECT id, name, status, custom_fields
+        FROM `gen-lang-client-0844868008.ClickUp_AirbyteCustom.task`
+        WHERE JSON_VALUE(list, '$.id') = @list_id
+            AND LOWER(JSON_VALUE(status, '$.status')) IN ('active', 'implementation')
+            AND EXISTS (
+                SELECT 1
+                FROM UNNEST(JSON_QUERY_ARRAY(custom_fields)) AS field,
+                    UNNEST(JSON_QUERY_ARRAY(field, '$.type_config.options')) AS opt
+                WHERE JSON_VALUE(field, '$.name') = 'Customer Type'
+                    AND LOWER(JSON_VALUE(opt, '$.name')) = 'view'
+                    AND JSON_VALUE(field, '$.value') IN (JSON_VALUE(opt, '$.orderindex'), JSON_VALUE(opt, '$.id'))
+            )
+    """
+    
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("list_id", "STRING", BQ_LIST_ID)
+        ]
+    )
+    
+    logger.info("Querying ClickUp for org code categorization...")
+    results = client.query_and_wait(query, job_config=job_config, page_size=BQ_PAGE_SIZE).to_arrow(create_bqstorage_client=True)
+    
+    # Classify tasks in chunks, across processes when there is more than one
+    tasks = list(zip(results.column('status').to_pylist(), results.column('custom_fields').to_pylist()))
+    chunks = [tasks[i:i + ORG_CODE_CHUNK_SIZE] for i in range(0, len(tasks), ORG_CODE_CHUNK_SIZE)]
+    if ORG_CODE_WORKERS > 1 and len(chunks) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=ORG_CODE_WORKERS) as executor:
+            partials = list(executor.map(_classify_clickup_tasks, chunks))
+    else:
+        partials = [_classify_clickup_tasks(chunk) for chunk in chunks]
+    
+    categories = [set().union(*category_sets) for category_sets in zip(*partials)] or [set() for _ in range(6)]
+    view_clinical_orgs, qrm_cadence_orgs, other_active_orgs, in_implementation_orgs, losing_access_qrm_orgs, corporate_cadence_labor_orgs = categories
+    
+    # View Clinical only keeps org codes that are NOT in any other campaign
+    view_clinical_orgs -= losing_access_qrm_orgs | corporate_cadence_labor_orgs | qrm_cadence_orgs
+    
     logger.info(f"Found {len(view_clinical_orgs)} View Clinical org codes: {list(view_clinical_orgs)[:10]}...")
     logger.info(f"Found {len(qrm_cadence_orgs)} QRM Cadence org codes: {list(qrm_cadence_orgs)[:10]}...")
     logger.info(f"Found {len(other_active_orgs)} Other Active org codes: {list(other_active_orgs)[:10]}...")
@@ -331,6 +468,9 @@ def step1_filter_rows(use_dynamic_org_codes=True):
     - Removes rows with internal email domains (@qrmhealth.com, @covr.care)
     - Classifies View User types and Campaign
     
+    The CSV is loaded as a pyarrow table and filtered/classified with
+    column-wise compute kernels rather than a Python loop over rows.
+    
     Args:
         use_dynamic_org_codes: If True, query ClickUp to dynamically determine
             org code categories. If False, use hardcoded sets.
@@ -359,82 +499,88 @@ def step1_filter_rows(use_dynamic_org_codes=True):
     # Combine all active org codes (those to KEEP)
     active_org_codes = view_clinical_codes | qrm_cadence_codes | other_active_codes | in_implementation_codes | losing_access_qrm_codes | corporate_cadence_labor_codes
     
+    # Campaign categories in priority order - a code in several sets gets the first
+    campaign_ladder = [
+        (losing_access_qrm_codes, "Losing access to QRM reports"),
+        (corporate_cadence_labor_codes, "customers who pay for labor reports (Selling Flow)"),
+        (view_clinical_codes, "View Clinical customers NOT using Labor (Labor + Flow expansion)"),
+        (qrm_cadence_codes, "Corporate Cadence for QRM MDS customers (Selling View labor expansion + Flow)"),
+        (in_implementation_codes, "In Implementation"),
+        (other_active_codes, "Other Active"),
+    ]
+    
+    # Collapse the ladder into one org_code -> campaign map, plus the two
+    # View User type labels per code, so each row needs a single lookup
+    campaign_by_org = {}
+    for codes, label in campaign_ladder:
+        for code in codes:
+            campaign_by_org.setdefault(code, label)
+    campaign_org_codes = pa.array(list(campaign_by_org), pa.string())
+    campaign_labels = pa.array(list(campaign_by_org.values()), pa.string())
+    corp_view_types = pa.array([f"{c} - Corp" for c in campaign_by_org.values()], pa.string())
+    facility_view_types = pa.array([f"{c} - facility" for c in campaign_by_org.values()], pa.string())
+    
     try:
+        # Read the header first so every column can be loaded as a string
         with open(INPUT_FILE, mode='r', newline='', encoding='utf-8-sig') as infile:
-            reader = csv.DictReader(infile)
-            
-            if 'email' not in reader.fieldnames:
-                logger.error(f"'email' column not found in {INPUT_FILE}")
-                return False
-            
-            # Add View User type and Campaign columns
-            fieldnames = list(reader.fieldnames) + ['View User type', 'campaign']
-            
-            with open(STEP1_OUTPUT, mode='w', newline='', encoding='utf-8') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                count_kept = 0
-                count_removed_org = 0
-                count_removed_internal = 0
-                count_removed_total = 0
-                
-                for row in reader:
-                    org_code = row.get('org_code', '').strip().upper()
-                    email = row.get('email', '').strip().lower()
-                    
-                    # Extract domain from email
-                    email_domain = ''
-                    if '@' in email:
-                        email_domain = email.split('@')[1]
-                    
-                    # Check if internal email domain
-                    is_internal = email_domain in INTERNAL_EMAIL_DOMAINS
-                    
-                    # Check if org code is in active list (or if org_code is empty)
-                    # Keep rows where org_code is either empty or in active_org_codes
-                    org_in_active = (org_code == '') or (org_code in active_org_codes)
-                    
-                    # Determine campaign category
-                    # Priority order: Losing Access QRM > Customers who pay for labor reports > QRM MDS Cadence > View Clinical > In Implementation > Other Active
-                    campaign = ''
-                    if org_code in losing_access_qrm_codes:
-                        campaign = "Losing access to QRM reports"
-                    elif org_code in corporate_cadence_labor_codes:
-                        campaign = "customers who pay for labor reports (Selling Flow)"
-                    elif org_code in view_clinical_codes:
-                        campaign = "View Clinical customers NOT using Labor (Labor + Flow expansion)"
-                    elif org_code in qrm_cadence_codes:
-                        campaign = "Corporate Cadence for QRM MDS customers (Selling View labor expansion + Flow)"
-                    elif org_code in in_implementation_codes:
-                        campaign = "In Implementation"
-                    elif org_code in other_active_codes:
-                        campaign = "Other Active"
-                    
-                    # Determine View User type (facility vs corp)
-                    if campaign:
-                        facilities = row.get('facilities', '').strip()
-                        if not facilities or ',' in facilities:
-                            view_user_type = f"{campaign} - Corp"
-                        else:
-                            view_user_type = f"{campaign} - facility"
-                    else:
-                        view_user_type = "View - No Labor"
-                    
-                    # Apply filters: Skip if internal email OR org not in active list
-                    if is_internal:
-                        count_removed_internal += 1
-                        continue
-                    
-                    if not org_in_active:
-                        count_removed_org += 1
-                        continue
-                    
-                    # Row passes filters - write it
-                    row['View User type'] = view_user_type
-                    row['campaign'] = campaign
-                    writer.writerow(row)
-                    count_kept += 1
+            header = next(csv.reader(infile), [])
+        
+        if 'email' not in header:
+            logger.error(f"'email' column not found in {INPUT_FILE}")
+            return False
+        
+        table = pa_csv.read_csv(
+            INPUT_FILE,
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in header},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False
+            )
+        )
+        
+        def column_or_blank(name):
+            if name in table.column_names:
+                return pc.utf8_trim_whitespace(table[name])
+            return pa.array([''] * table.num_rows, pa.string())
+        
+        org_code = pc.utf8_upper(column_or_blank('org_code'))
+        email = column_or_blank('email')
+        facilities = column_or_blank('facilities')
+        
+        # Extract domain from email (text between the first and second '@') and
+        # check if it is an internal email domain; only the domain is lowercased
+        email_domain = pc.utf8_lower(pc.struct_field(pc.extract_regex(email, r'^[^@]*@(?P<domain>[^@]*)'), 'domain'))
+        is_internal = pc.fill_null(pc.is_in(email_domain, value_set=pa.array(sorted(INTERNAL_EMAIL_DOMAINS))), False)
+        
+        # Keep rows where org_code is either empty or in active_org_codes
+        org_in_active = pc.or_(
+            pc.equal(org_code, ''),
+            pc.is_in(org_code, value_set=pa.array(sorted(active_org_codes), pa.string()))
+        )
+        
+        # Determine campaign category and View User type (facility vs corp)
+        # from the position of each org_code in the precomputed map
+        campaign_idx = pc.index_in(org_code, value_set=campaign_org_codes)
+        campaign = pc.fill_null(pc.take(campaign_labels, campaign_idx), '')
+        is_corp = pc.or_(pc.equal(facilities, ''), pc.match_substring(facilities, ','))
+        view_user_type = pc.fill_null(
+            pc.if_else(is_corp, pc.take(corp_view_types, campaign_idx), pc.take(facility_view_types, campaign_idx)),
+            "View - No Labor"
+        )
+        
+        # Apply filters: Skip if internal email OR org not in active list
+        keep = pc.and_(pc.invert(is_internal), org_in_active)
+        count_removed_internal = pc.sum(is_internal).as_py() or 0
+        count_removed_org = pc.sum(pc.and_(pc.invert(is_internal), pc.invert(org_in_active))).as_py() or 0
+        
+        # Add View User type and Campaign columns, then keep passing rows
+        table = table.append_column('View User type', view_user_type)
+        table = table.append_column('campaign', campaign)
+        table = table.filter(keep)
+        count_kept = table.num_rows
+        
+        pq.write_table(table, STEP1_OUTPUT, compression='zstd')
         
         count_removed_total = count_removed_org + count_removed_internal
         logger.info(f"Step 1 complete.")
@@ -453,74 +599,269 @@ def step1_filter_rows(use_dynamic_org_codes=True):
 # STEP 2: EMAIL VERIFICATION
 # =============================================================================
 
-def verify_email(email):
-    """Verifies a single email against the local API."""
+# Columns added by step 2
+VALIDATION_COLUMNS = [
+    'validation_status', 'validation_score', 'syntax', 'domain_exists',
+    'mx_records', 'is_disposable', 'is_role_based',
+    'alias_of', 'typo_suggestion', 'validation_error'
+]
+
+# Emails the validator is certain to reject at its syntax check: it needs
+# exactly one '@', a non-empty local part of at most 64 characters, a
+# non-empty domain, and at most 254 characters overall
+_EMAIL_SHAPE_RE = re.compile(r'[^@]{1,64}@[^@]+')
+MAX_EMAIL_LENGTH = 254
+
+# The validator's response for an email that fails its syntax check
+_INVALID_FORMAT_RESPONSE = {
+    'validations': {
+        'syntax': False, 'domain_exists': False, 'mx_records': False,
+        'mailbox_exists': False, 'is_disposable': False, 'is_role_based': False
+    },
+    'score': 0,
+    'status': 'INVALID_FORMAT'
+}
+
+def _failed_validation(status, error, checks=None):
+    """Builds the validation result for an email the API could not verify."""
+    return {
+        'validation_status': status,
+        'validation_score': 0,
+        'syntax': checks,
+        'domain_exists': checks,
+        'mx_records': checks,
+        'is_disposable': checks,
+        'is_role_based': checks,
+        'alias_of': '',
+        'typo_suggestion': '',
+        'validation_error': error
+    }
+
+def _validation_result(data):
+    """Maps one API validation response onto the step 2 output columns."""
+    validations = data.get('validations', {})
+    return {
+        'validation_status': data.get('status', 'UNKNOWN'),
+        'validation_score': data.get('score', 0),
+        'syntax': validations.get('syntax'),
+        'domain_exists': validations.get('domain_exists'),
+        'mx_records': validations.get('mx_records'),
+        'is_disposable': validations.get('is_disposable'),
+        'is_role_based': validations.get('is_role_based'),
+        'alias_of': data.get('aliasOf', ''),
+        'typo_suggestion': data.get('typoSuggestion', ''),
+        'validation_error': ''
+    }
+
+async def verify_email_batch_async(session, sem, emails):
+    """Verifies a batch of emails with one request to the batch API.
+    
+    Returns a validation result per email, in the order given. At most
+    MAX_WORKERS requests are in flight at once (bounded by sem); connection
+    failures are retried twice with a short backoff.
+    """
+    async with sem:
+        try:
+            for attempt in range(3):
+                try:
+                    async with session.post(API_BATCH_URL, json={'emails': emails}) as response:
+                        response.raise_for_status()
+                        data = await response.json()
+                    break
+                except aiohttp.ClientConnectorError:
+                    if attempt == 2:
+                        raise
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+            
+            results_by_email = {result.get('email'): result for result in data.get('results') or []}
+            return [
+                _validation_result(results_by_email[email]) if email in results_by_email
+                else _failed_validation('ERROR', 'Missing from batch response', checks=False)
+                for email in emails
+            ]
+        except asyncio.TimeoutError:
+            # API timeout (checked first: aiohttp's timeout errors are also
+            # connection errors)
+            return [_failed_validation('TIMEOUT', 'API request timeout')] * len(emails)
+        except aiohttp.ClientConnectionError:
+            # API server not running - return unknown status
+            return [_failed_validation('UNKNOWN', 'API server not available')] * len(emails)
+        except aiohttp.ClientError as e:
+            logger.error(f"Error verifying batch of {len(emails)} emails: {e}")
+            return [_failed_validation('ERROR', str(e), checks=False)] * len(emails)
+
+def _load_verified_results():
+    """Reads definitive validation results from an existing STEP2_OUTPUT.
+    
+    Returns a dict of email -> validation values (in VALIDATION_COLUMNS order)
+    for rows that verified cleanly, so a rerun can skip those addresses.
+    Errors, timeouts and unknown results are left out and get retried.
+    """
+    verified = {}
+    if not os.path.exists(STEP2_OUTPUT):
+        return verified
+    
     try:
-        response = requests.get(API_URL, params={'email': email}, timeout=BATCH_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-        
-        validations = data.get('validations', {})
-        return {
-            'validation_status': data.get('status', 'UNKNOWN'),
-            'validation_score': data.get('score', 0),
-            'syntax': validations.get('syntax'),
-            'domain_exists': validations.get('domain_exists'),
-            'mx_records': validations.get('mx_records'),
-            'is_disposable': validations.get('is_disposable'),
-            'is_role_based': validations.get('is_role_based'),
-            'alias_of': data.get('aliasOf', ''),
-            'typo_suggestion': data.get('typoSuggestion', ''),
-            'validation_error': ''
-        }
-    except requests.exceptions.ConnectionError:
-        # API server not running - return unknown status
-        return {
-            'validation_status': 'UNKNOWN',
-            'validation_score': 0,
-            'syntax': None,
-            'domain_exists': None,
-            'mx_records': None,
-            'is_disposable': None,
-            'is_role_based': None,
-            'alias_of': '',
-            'typo_suggestion': '',
-            'validation_error': 'API server not available'
-        }
-    except requests.exceptions.Timeout:
-        # API timeout
-        return {
-            'validation_status': 'TIMEOUT',
-            'validation_score': 0,
-            'syntax': None,
-            'domain_exists': None,
-            'mx_records': None,
-            'is_disposable': None,
-            'is_role_based': None,
-            'alias_of': '',
-            'typo_suggestion': '',
-            'validation_error': 'API request timeout'
-        }
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error verifying {email}: {e}")
-        return {
-            'validation_status': 'ERROR',
-            'validation_score': 0,
-            'syntax': False,
-            'domain_exists': False,
-            'mx_records': False,
-            'is_disposable': False,
-            'is_role_based': False,
-            'alias_of': '',
-            'typo_suggestion': '',
-            'validation_error': str(e)
-        }
+        table = pq.read_table(STEP2_OUTPUT)
+        header = table.column_names
+        email_idx = next((i for i, field in enumerate(header) if field.lower() == 'email'), None)
+        if email_idx is None or not all(f in header for f in VALIDATION_COLUMNS):
+            return verified
+        
+        emails = table.column(email_idx).to_pylist()
+        statuses = table.column('validation_status').to_pylist()
+        errors = table.column('validation_error').to_pylist()
+        value_rows = zip(*(table.column(f).to_pylist() for f in VALIDATION_COLUMNS))
+        for email, status, error, values in zip(emails, statuses, errors, value_rows):
+            if not email or status in ('', 'ERROR', 'TIMEOUT', 'UNKNOWN') or error:
+                continue
+            verified[email] = list(values)
+    except Exception as e:
+        logger.warning(f"Could not read previous results from {STEP2_OUTPUT}: {e}")
+        return {}
+    
+    return verified
+
+def _as_text(value):
+    """Formats a validation value as it would appear in a CSV cell."""
+    return '' if value is None else str(value)
+
+def _write_known_results(reader, writer, email_idx, validation_idx, verified):
+    """Writes every row of reader with its result from verified, without calling the API.
+    
+    Used when a step 2 run fails part way: the output then still holds every
+    result known so far, from earlier runs and this one, and rows without a
+    result are left blank so the next resumed run verifies them.
+    """
+    output_width = len(writer.schema)
+    while True:
+        chunk = list(itertools.islice(reader, STEP2_CHUNK_SIZE))
+        if not chunk:
+            break
+        out_rows = []
+        for row in chunk:
+            email = row[email_idx] if email_idx < len(row) else ''
+            out = row + [''] * (output_width - len(row))
+            for i, value in zip(validation_idx, verified.get(email, ())):
+                out[i] = value
+            out_rows.append(out)
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(column, pa.string()) for column in zip(*out_rows)],
+            schema=writer.schema
+        ))
+
+async def _verify_rows_async(reader, writer, email_idx, validation_idx, verified):
+    """Verifies the rows of reader chunk by chunk, writing each chunk to the
+    Parquet writer as one row group.
+    
+    Rows are lists of strings; each is written, in input order, with its
+    validation values placed at the output positions in validation_idx (one
+    per VALIDATION_COLUMNS entry).
+    verified maps email -> validation values already known; it is extended
+    with each new successful result.
+    
+    Returns the number of rows processed.
+    """
+    processed_count = 0
+    output_width = len(writer.schema)
+    invalid_format_values = [_as_text(v) for v in _validation_result(_INVALID_FORMAT_RESPONSE).values()]
+    out_rows = []
+    
+    def write_row(pos, row, values=()):
+        out = row + [''] * (output_width - len(row))
+        for i, value in zip(validation_idx, values):
+            out[i] = value
+        out_rows[pos] = out
+    
+    connector = aiohttp.TCPConnector(limit=MAX_WORKERS)
+    timeout = aiohttp.ClientTimeout(total=BATCH_TIMEOUT)
+    sem = asyncio.Semaphore(MAX_WORKERS)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        while True:
+            chunk = list(itertools.islice(reader, STEP2_CHUNK_SIZE))
+            if not chunk:
+                break
+            
+            # Output slots in input order, filled as results become known
+            out_rows[:] = [None] * len(chunk)
+            
+            # Group row positions by email so each address is verified once
+            rows_by_email = {}
+            for pos, row in enumerate(chunk):
+                email = row[email_idx] if email_idx < len(row) else ''
+                if not email:
+                    write_row(pos, row)
+                    processed_count += 1
+                elif email in verified:
+                    write_row(pos, row, verified[email])
+                    processed_count += 1
+                elif len(email) > MAX_EMAIL_LENGTH or not _EMAIL_SHAPE_RE.fullmatch(email):
+                    # Malformed addresses are answered locally, as the API would
+                    verified[email] = invalid_format_values
+                    write_row(pos, row, invalid_format_values)
+                    processed_count += 1
+                else:
+                    rows_by_email.setdefault(email, []).append(pos)
+            
+            # Verify the new addresses in batches of VALIDATION_BATCH_SIZE
+            pending = list(rows_by_email)
+            batches = [pending[i:i + VALIDATION_BATCH_SIZE] for i in range(0, len(pending), VALIDATION_BATCH_SIZE)]
+            batch_results = await asyncio.gather(
+                *(verify_email_batch_async(session, sem, batch) for batch in batches),
+                return_exceptions=True
+            )
+            
+            for batch, results in zip(batches, batch_results):
+                if isinstance(results, Exception):
+                    logger.error(f"Batch generated an exception: {results}")
+                    error_values = ['' if f != 'validation_error' else str(results) for f in VALIDATION_COLUMNS]
+                    for email in batch:
+                        for pos in rows_by_email[email]:
+                            write_row(pos, chunk[pos], error_values)
+                        processed_count += len(rows_by_email[email])
+                    continue
+                for email, validation_result in zip(batch, results):
+                    positions = rows_by_email[email]
+                    values = [_as_text(validation_result[f]) for f in VALIDATION_COLUMNS]
+                    # Only reuse definitive results; errors and timeouts are retried
+                    if not validation_result['validation_error']:
+                        verified[email] = values
+                    for pos in positions:
+                        write_row(pos, chunk[pos], values)
+                    processed_count += len(positions)
+            
+            # Write the chunk as one row group so progress is on disk per chunk
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, pa.string()) for column in zip(*out_rows)],
+                schema=writer.schema
+            ))
+            logger.info(f"Processed {processed_count} rows")
+    
+    return processed_count
 
-def step2_verify_emails():
+def step2_verify_emails(resume=True):
     """Step 2: Verify emails using local API.
     
     This step only runs on the filtered rows from Step 1,
     which excludes internal email domains (@qrmhealth.com, @covr.care).
+    
+    Rows are streamed in chunks of STEP2_CHUNK_SIZE: each chunk is verified
+    and written before the next is read, so memory stays bounded by the chunk
+    size and API calls start as soon as the first chunk is read.
+    
+    Each distinct address is sent to the API once; rows repeating an address
+    (within or across chunks) reuse its result; malformed addresses are marked
+    INVALID_FORMAT without an API call. Addresses are posted to the
+    batch API VALIDATION_BATCH_SIZE at a time, with batches issued
+    concurrently from a single asyncio event loop over one aiohttp session.
+    
+    The output is replaced atomically. If verification fails part way, the
+    output is rewritten with every result known so far, from earlier runs
+    and this one, so repeated interrupted runs keep their progress.
+    
+    Args:
+        resume: If True and STEP2_OUTPUT already exists, addresses it records
+            as successfully verified are reused instead of sent to the API again.
     """
     logger.info("=" * 50)
     logger.info("STEP 2: Email Verification")
@@ -530,71 +871,62 @@ def step2_verify_emails():
         logger.error(f"Input file {STEP1_OUTPUT} not found. Run step 1 first.")
         return False
     
-    # Read all rows
-    rows = []
-    email_col = None
+    # Successful verification values (in VALIDATION_COLUMNS order) by email address
+    verified = _load_verified_results() if resume else {}
+    if verified:
+        logger.info(f"Resuming: reusing {len(verified)} verified emails from {STEP2_OUTPUT}")
     
     try:
-        with open(STEP1_OUTPUT, mode='r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for field in reader.fieldnames:
-                if field.lower() == 'email':
-                    email_col = field
-                    break
-            
-            if not email_col:
-                logger.error(f"Column 'email' not found in CSV.")
+        input_file = pq.ParquetFile(STEP1_OUTPUT)
+        fieldnames = input_file.schema_arrow.names
+        email_idx = None
+        for i, field in enumerate(fieldnames):
+            if field.lower() == 'email':
+                email_idx = i
+                break
+        
+        if email_idx is None:
+            logger.error(f"Column 'email' not found in {STEP1_OUTPUT}.")
+            return False
+        
+        output_fieldnames = list(fieldnames)
+        output_fieldnames += [f for f in VALIDATION_COLUMNS if f not in output_fieldnames]
+        validation_idx = [output_fieldnames.index(f) for f in VALIDATION_COLUMNS]
+        output_schema = pa.schema([(name, pa.string()) for name in output_fieldnames])
+        
+        def read_rows():
+            """Streams rows (as lists) out of the Parquet file batch by batch."""
+            return (
+                list(row)
+                for batch in input_file.iter_batches(batch_size=STEP2_CHUNK_SIZE)
+                for row in zip(*(column.to_pylist() for column in batch.columns))
+            )
+        
+        # A Parquet file is only readable once its footer is written on close,
+        # so write to a temporary file and move it into place when complete;
+        # an interrupted run leaves the previous STEP2_OUTPUT intact.
+        tmp_output = f"{STEP2_OUTPUT}.tmp"
+        try:
+            try:
+                with pq.ParquetWriter(tmp_output, output_schema, compression='zstd') as writer:
+                    asyncio.run(_verify_rows_async(read_rows(), writer, email_idx, validation_idx, verified))
+            except Exception as e:
+                # Keep every result known so far (including the previous
+                # output's) so a rerun resumes from here
+                logger.error(f"Email verification failed: {e}")
+                logger.info(f"Saving {len(verified)} verified emails to {STEP2_OUTPUT} for resuming")
+                with pq.ParquetWriter(tmp_output, output_schema, compression='zstd') as writer:
+                    _write_known_results(read_rows(), writer, email_idx, validation_idx, verified)
+                os.replace(tmp_output, STEP2_OUTPUT)
                 return False
-            
-            for row in reader:
-                rows.append(row)
+            os.replace(tmp_output, STEP2_OUTPUT)
+        finally:
+            if os.path.exists(tmp_output):
+                os.remove(tmp_output)
     except Exception as e:
-        logger.error(f"Failed to read CSV: {e}")
+        logger.error(f"Failed to process {STEP1_OUTPUT}: {e}")
         return False
     
-    logger.info(f"Loaded {len(rows)} rows to process.")
-    
-    validation_fieldnames = [
-        'validation_status', 'validation_score', 'syntax', 'domain_exists', 
-        'mx_records', 'is_disposable', 'is_role_based', 
-        'alias_of', 'typo_suggestion', 'validation_error'
-    ]
-    
-    output_fieldnames = list(rows[0].keys()) if rows else []
-    output_fieldnames += [f for f in validation_fieldnames if f not in output_fieldnames]
-    
-    processed_count = 0
-    
-    with open(STEP2_OUTPUT, mode='w', newline='', encoding='utf-8') as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=output_fieldnames)
-        writer.writeheader()
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_row = {}
-            for row in rows:
-                email = row.get(email_col)
-                if email:
-                    future = executor.submit(verify_email, email)
-                    future_to_row[future] = row
-                else:
-                    writer.writerow(row)
-                    processed_count += 1
-            
-            for future in concurrent.futures.as_completed(future_to_row):
-                row = future_to_row[future]
-                try:
-                    validation_result = future.result()
-                    row.update(validation_result)
-                    writer.writerow(row)
-                    outfile.flush()
-                    processed_count += 1
-                    if processed_count % 100 == 0:
-                        logger.info(f"Processed {processed_count}/{len(rows)}")
-                except Exception as exc:
-                    logger.error(f"Row generated an exception: {exc}")
-                    row['validation_error'] = str(exc)
-                    writer.writerow(row)
-    
     logger.info(f"Step 2 complete. Output: {STEP2_OUTPUT}")
     return True
 
@@ -602,60 +934,95 @@ def step2_verify_emails():
 # STEP 3: ENRICHMENT (BIGQUERY)
 # =============================================================================
 
-def get_clickup_maps(hubspot_companies=None):
+def get_clickup_maps(hubspot_companies=None, refresh=False):
     """Fetch ClickUp tasks and build lookup maps.
     
     Args:
         hubspot_companies: Optional pre-fetched HubSpot companies dict to avoid duplicate queries.
                           If not provided, will fetch internally (for backward compatibility).
+        refresh: If True, query BigQuery even if a fresh local copy of the tasks is cached.
+    
+    Returns:
+        - org_map: org code -> task info tuple
+        - name_list: list of (original_name, norm_name, *task info) tuples for name matching
+        - task_map: task ID -> (customer_type, hubspot_url, hubspot_record_id, hubspot_company, services)
+        - norm_name_to_infos: norm_name -> list of name_list tuples, for exact name lookups
+        - id_to_info: task ID -> name_list tuple
     """
-    client = bigquery.Client(project=BQ_PROJECT_ID)
+    client = get_bq_client()
     
     # Only fetch if not provided
     if hubspot_companies is None:
         hubspot_companies = get_hubspot_companies()
     
-    query = f"""
-        SELECT id, name, status, custom_fields
+    # Only the four custom fields read below are sent back, as a JSON array
+    # string, instead of every custom field of every task. custom_fields may
+    # be STRING or JSON: for STRING the array elements are JSON-encoded
+    # strings, which the loop below decodes.
+    query = """
+        SELECT id, name, status,
+            TO_JSON_STRING(ARRAY(
+                SELECT field
+                FROM UNNEST(JSON_QUERY_ARRAY(custom_fields)) AS field
+                WHERE JSON_VALUE(field, '$.name') IN ('Customer Type', 'Services', 'Hubspot URL', 'Org Code')
+            )) AS custom_fields
         FROM `gen-lang-client-0844868008.ClickUp_AirbyteCustom.task`
-        WHERE JSON_VALUE(list, '$.id') = '{BQ_LIST_ID}'
+        WHERE JSON_VALUE(list, '$.id') = @list_id
     """
     
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("list_id", "STRING", BQ_LIST_ID)
+        ]
+    )
+    
     logger.info("Fetching ClickUp tasks from BigQuery...")
-    query_job = client.query(query)
-    results = query_job.result()
+    tasks = _cached_arrow(
+        f"{query}:{BQ_LIST_ID}",
+        lambda: client.query_and_wait(query, job_config=job_config, page_size=BQ_PAGE_SIZE).to_arrow(create_bqstorage_client=True),
+        refresh=refresh
+    )
     
     org_map = {}
     name_list = []
     task_map = {}
+    norm_name_to_infos = {}
+    id_to_info = {}
     
-    for row in results:
-        task_id = row.id
-        task_name = row.name
-        status_json = row.status
-        
+    task_columns = (tasks.column(name).to_pylist() for name in ('id', 'name', 'status', 'custom_fields'))
+    for task_id, task_name, status_json, cfields_raw in zip(*task_columns):
         status_val = 'unknown'
         if isinstance(status_json, str):
             try:
-                s_dict = json.loads(status_json)
+                s_dict = orjson.loads(status_json)
                 status_val = s_dict.get('status')
             except:
                 pass
         elif isinstance(status_json, dict):
             status_val = status_json.get('status')
         
-        cfields_raw = row.custom_fields
         cfields = []
         if isinstance(cfields_raw, str):
             try:
-                cfields = json.loads(cfields_raw)
+                cfields = orjson.loads(cfields_raw)
             except:
                 continue
         elif isinstance(cfields_raw, list):
             cfields = cfields_raw
         
+        # Index custom fields by name once; the first field with a name wins
+        cf_by_name = {}
+        for f in cfields:
+            if isinstance(f, str):
+                try:
+                    f = orjson.loads(f)
+                except orjson.JSONDecodeError:
+                    continue
+            if isinstance(f, dict):
+                cf_by_name.setdefault(f.get('name'), f)
+        
         customer_type = ''
-        customer_type_field = next((f for f in cfields if f.get('name') == 'Customer Type'), None)
+        customer_type_field = cf_by_name.get('Customer Type')
         if customer_type_field:
             value_ids = customer_type_field.get('value', [])
             if isinstance(value_ids, (str, int)):
@@ -663,31 +1030,31 @@ def get_clickup_maps(hubspot_companies=None):
             elif not isinstance(value_ids, list):
                 value_ids = [value_ids]
             if value_ids:
+                value_ids_str = {str(v) for v in value_ids}
                 options = customer_type_field.get('type_config', {}).get('options', [])
                 for opt in options:
-                    if str(opt.get('id')) in [str(v) for v in value_ids]:
+                    if str(opt.get('id')) in value_ids_str:
                         customer_type = opt.get('label', '')
                         break
         
         # Extract Services field (e.g., "MDS, QRM")
         services = ''
-        services_field = next((f for f in cfields if f.get('name') == 'Services'), None)
+        services_field = cf_by_name.get('Services')
         if services_field:
             service_value = services_field.get('value', '')
             type_config = services_field.get('type_config', {})
             if isinstance(service_value, list) and type_config.get('options'):
-                service_names = []
-                for service_id in service_value:
-                    for option in type_config.get('options', []):
-                        if option.get('id') == service_id:
-                            service_names.append(option.get('label', service_id))
-                            break
+                # Option ID -> label, first option winning for duplicate IDs
+                label_by_id = {}
+                for option in type_config.get('options', []):
+                    label_by_id.setdefault(option.get('id'), option.get('label', option.get('id')))
+                service_names = [label_by_id[service_id] for service_id in service_value if service_id in label_by_id]
                 services = ', '.join(service_names) if service_names else str(service_value)
             elif service_value:
                 services = str(service_value)
         
         hubspot_url = ''
-        hubspot_field = next((f for f in cfields if f.get('name') == 'Hubspot URL'), None)
+        hubspot_field = cf_by_name.get('Hubspot URL')
         if hubspot_field:
             hubspot_url = hubspot_field.get('value', '')
             if isinstance(hubspot_url, list) and hubspot_url:
@@ -708,9 +1075,12 @@ def get_clickup_maps(hubspot_companies=None):
         if task_name:
             norm_name = task_name.strip().upper()
             original_name = task_name.strip()
-            name_list.append((original_name, norm_name, task_id, status_val, customer_type, hubspot_url, hubspot_record_id, hubspot_company, services))
+            name_info = (original_name, norm_name, task_id, status_val, customer_type, hubspot_url, hubspot_record_id, hubspot_company, services)
+            name_list.append(name_info)
+            norm_name_to_infos.setdefault(norm_name, []).append(name_info)
+            id_to_info[task_id] = name_info
         
-        field = next((f for f in cfields if f.get('name') == 'Org Code'), None)
+        field = cf_by_name.get('Org Code')
         if not field:
             continue
         
@@ -722,43 +1092,95 @@ def get_clickup_maps(hubspot_companies=None):
         if not value_ids:
             continue
         
+        value_ids_str = {str(v) for v in value_ids}
         options = field.get('type_config', {}).get('options', [])
         
         for opt in options:
-            if str(opt.get('id')) in [str(v) for v in value_ids]:
-                label = opt.get('label', '')
-                normalized = label.replace(',', ' ').replace('-', ' ').replace('/', ' ')
-                words = normalized.split()
-                
-                for word in words:
-                    clean_code = word.strip().upper()
-                    if clean_code:
-                        org_map[clean_code] = task_info
+            if str(opt.get('id')) in value_ids_str:
+                for word in _ORG_CODE_SPLIT.split(opt.get('label', '')):
+                    if word:
+                        org_map[word.upper()] = task_info
     
-    return org_map, name_list, task_map
+    return org_map, name_list, task_map, norm_name_to_infos, id_to_info
 
 def get_hubspot_companies():
-    """Fetch HubSpot companies from BigQuery."""
-    client = bigquery.Client(project=BQ_PROJECT_ID)
+    """Fetch HubSpot companies from BigQuery.
     
-    query = """
-        SELECT id, properties_name
-        FROM `gen-lang-client-0844868008.HubSpot_Airbyte.companies`
-        WHERE properties_name IS NOT NULL
+    Reads the two needed columns straight from the table with list_rows,
+    which skips creating (and billing) a query job for a plain scan, and
+    downloads them as Arrow through the BigQuery Storage API. The result is
+    cached locally for BQ_CACHE_TTL seconds (see _cached_arrow).
     """
+    client = get_bq_client()
     
     logger.info("Fetching HubSpot companies from BigQuery...")
-    query_job = client.query(query)
-    results = query_job.result()
+    table_id = "gen-lang-client-0844868008.HubSpot_Airbyte.companies"
+    
+    def fetch():
+        table = client.get_table(table_id)
+        selected_fields = [field for field in table.schema if field.name in ('id', 'properties_name')]
+        rows = client.list_rows(table, selected_fields=selected_fields, page_size=BQ_PAGE_SIZE)
+        return rows.to_arrow(create_bqstorage_client=True)
+    
+    companies = _cached_arrow(f"{table_id}:id,properties_name", fetch)
     
     hubspot_map = {}
-    for row in results:
-        hubspot_map[str(row.id)] = row.properties_name.strip() if row.properties_name else ''
+    for company_id, name in zip(companies.column('id').to_pylist(), companies.column('properties_name').to_pylist()):
+        # Equivalent of WHERE properties_name IS NOT NULL
+        if name is None:
+            continue
+        hubspot_map[str(company_id)] = name.strip()
     
     logger.info(f"Fetched {len(hubspot_map)} HubSpot companies.")
     return hubspot_map
 
 
+def get_clickup_name_matches(corporations):
+    """Match corporation names to ClickUp tasks by substring containment in BigQuery.
+    
+    The names are sent as an array parameter and joined against the task table
+    server-side, instead of scanning every task name in Python for every row:
+    - A name matches a task if either one contains the other (case-insensitive)
+    - When several tasks match, the lowest task ID wins so results are stable
+    
+    Args:
+        corporations: Set or list of normalized (stripped, uppercased) corporation names
+    
+    Returns:
+        Dict mapping each matched corporation name to a ClickUp task ID
+    """
+    if not corporations:
+        return {}
+    
+    client = get_bq_client()
+    
+    query = """
+        SELECT corporation, MIN(t.id) AS task_id
+        FROM UNNEST(@corporations) AS corporation
+        JOIN `gen-lang-client-0844868008.ClickUp_AirbyteCustom.task` AS t
+            ON STRPOS(UPPER(TRIM(t.name)), corporation) > 0
+            OR STRPOS(corporation, UPPER(TRIM(t.name))) > 0
+        WHERE JSON_VALUE(t.list, '$.id') = @list_id
+            AND TRIM(t.name) != ''
+        GROUP BY corporation
+    """
+    
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ArrayQueryParameter("corporations", "STRING", list(corporations)),
+            bigquery.ScalarQueryParameter("list_id", "STRING", BQ_LIST_ID)
+        ]
+    )
+    
+    logger.info(f"Matching {len(corporations)} corporation names against ClickUp tasks in BigQuery...")
+    # Errors propagate: silently returning no matches would skew step 3's match counts
+    results = client.query_and_wait(query, job_config=job_config, page_size=BQ_PAGE_SIZE)
+    name_matches = {row.corporation: row.task_id for row in results}
+    
+    logger.info(f"Matched {len(name_matches)} corporation names to ClickUp tasks.")
+    return name_matches
+
+
 def get_hubspot_contacts_batch_param(batch):
     """Fetch a batch of HubSpot contacts using parameterized query with arrays.
     
@@ -766,8 +1188,9 @@ def get_hubspot_contacts_batch_param(batch):
     - Uses IN UNNEST(@emails) instead of building OR conditions
     - Supports larger batch sizes (1000+ emails)
     - Prevents SQL injection
+    - Returns one contact per email, deduplicated server-side
     """
-    client = bigquery.Client(project=BQ_PROJECT_ID)
+    client = get_bq_client()
     
     # Use parameterized query with array - much more efficient!
     query = """
@@ -780,6 +1203,9 @@ def get_hubspot_contacts_batch_param(batch):
             `gen-lang-client-0844868008.HubSpot_Airbyte.contacts`
         WHERE
             properties_email IN UNNEST(@emails)
+        -- Several contact records can share an email; only one is kept anyway
+        QUALIFY
+            ROW_NUMBER() OVER (PARTITION BY properties_email) = 1
     """
     
     job_config = bigquery.QueryJobConfig(
@@ -790,8 +1216,7 @@ def get_hubspot_contacts_batch_param(batch):
     
     batch_results = {}
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = query_job.result()
+        results = client.query_and_wait(query, job_config=job_config, page_size=BQ_PAGE_SIZE)
         
         for row in results:
             email = row.email if hasattr(row, 'email') else ''
@@ -807,7 +1232,7 @@ def get_hubspot_contacts_batch_param(batch):
     return batch_results
 
 
-def get_hubspot_contacts(emails, max_workers=10):
+def get_hubspot_contacts(emails, max_workers=8):
     """
     Fetch HubSpot contacts from BigQuery by email addresses.
     Returns contact information for individual people.
@@ -819,7 +1244,8 @@ def get_hubspot_contacts(emails, max_workers=10):
     
     Args:
         emails: Set or list of email addresses to lookup
-        max_workers: Number of parallel queries (default 10)
+        max_workers: Maximum number of parallel queries (default 8); never
+            more threads than there are batches are started
     """
     if not emails:
         return {}
@@ -836,7 +1262,7 @@ def get_hubspot_contacts(emails, max_workers=10):
     logger.info(f"Fetching HubSpot contacts in {len(batches)} parallel batches ({batch_size} emails each)...")
     
     # Execute batches in parallel
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
         futures = [executor.submit(get_hubspot_contacts_batch_param, batch) for batch in batches]
         
         for future in concurrent.futures.as_completed(futures):
@@ -849,8 +1275,294 @@ def get_hubspot_contacts(emails, max_workers=10):
     logger.info(f"Fetched {len(hubspot_contacts)} HubSpot contacts.")
     return hubspot_contacts
 
+# Columns added by step 3 (including services and hubspot contact info)
+ENRICHMENT_COLUMNS = [
+    'task_id', 'task_status', 'customer_type', 'services', 'hubspot_url',
+    'hubspot corporation record id', 'hubspot corporation name',
+    'facility_task_id', 'facility_task_name', 'facility_corporation_task',
+    'facility_corporation_name', 'facility_hubspot_url',
+    'facility_hubspot_record_id', 'facility_hubspot_company',
+    'hubspot_contact_id', 'hubspot_contact_first_name', 'hubspot_contact_last_name',
+    'match_method', 'job title'
+]
+
+# Parenthesized job title appended to last_name, e.g. "Smith (Administrator)"
+_JOB_TITLE_PATTERN = r'\((?P<title>.*?)\)'
+
+# Read-only lookup data for step 3, set once per worker process
+_STEP3_CONTEXT = {}
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _build_trigram_index(names):
+    """Index names by their 3-character substrings for containment lookups.
+    
+    Returns (postings, trigram_counts, short_idxs): trigram -> ascending name
+    indices, the number of distinct trigrams of each name, and the indices of
+    names too short to have any trigram.
+    """
+    postings = {}
+    trigram_counts = []
+    short_idxs = []
+    for i, name in enumerate(names):
+        name_trigrams = _trigrams(name)
+        trigram_counts.append(len(name_trigrams))
+        if not name_trigrams:
+            short_idxs.append(i)
+        for trigram in name_trigrams:
+            postings.setdefault(trigram, []).append(i)
+    return postings, trigram_counts, short_idxs
+
+
+def _find_containment_match(query, names, index):
+    """Index of the first name that contains query or is contained in it, or None.
+    
+    Equivalent to scanning names in order, but only names sharing the
+    required trigrams with query are checked.
+    """
+    postings, trigram_counts, short_idxs = index
+    query_trigrams = _trigrams(query)
+    
+    # query in name: the name must contain every trigram of query
+    if query_trigrams:
+        candidates = None
+        for trigram in query_trigrams:
+            idxs = postings.get(trigram, ())
+            candidates = set(idxs) if candidates is None else candidates.intersection(idxs)
+            if not candidates:
+                break
+    else:
+        candidates = set(range(len(names)))
+    
+    # name in query: every trigram of the name must occur in query
+    hits = {}
+    for trigram in query_trigrams:
+        for i in postings.get(trigram, ()):
+            hits[i] = hits.get(i, 0) + 1
+    candidates.update(i for i, count in hits.items() if count == trigram_counts[i])
+    candidates.update(short_idxs)
+    
+    for i in sorted(candidates):
+        if query in names[i] or names[i] in query:
+            return i
+    return None
+
+
+def _init_step3_worker(context):
+    """Stash the step 3 lookup maps in this process's globals."""
+    global _STEP3_CONTEXT
+    _STEP3_CONTEXT = context
+
+
+def _cell(row, idx):
+    """Return the stripped value at idx of a positional row, or '' if the column is absent."""
+    return row[idx].strip() if idx is not None else ''
+
+
+def _facility_name(row, col):
+    """Return the facility of a facility-type user with a campaign and a single facility, else ''."""
+    facilities = _cell(row, col.get('facilities'))
+    if (_cell(row, col.get('campaign')) and 'facility' in _cell(row, col.get('View User type')).lower()
+            and ',' not in facilities):
+        return facilities
+    return ''
+
+
+def _match_hubspot_facilities(facility_names, hubspot_companies):
+    """Fuzzy match facility names to HubSpot companies in batched rapidfuzz calls.
+    
+    Each distinct facility name is scored against every company name with
+    process.cdist, which runs the comparisons in C across all cores, and keeps
+    the first best match scoring at least 60. Facility names are scored in
+    chunks so each score matrix stays within FACILITY_MATCH_MAX_CELLS cells.
+    
+    fuzz.ratio is an Indel (longest common subsequence) similarity, which never
+    scores below difflib's Ratcliff/Obershelp ratio, so this matches somewhat
+    more loosely than the former difflib.get_close_matches(cutoff=0.6). Ties
+    also go to the first company rather than the lexicographically last name.
+    
+    Returns:
+        dict: facility name -> (hubspot record id, hubspot company name)
+    """
+    facility_names = list(facility_names)
+    hubspot_ids = list(hubspot_companies.keys())
+    hubspot_names = list(hubspot_companies.values())
+    if not facility_names or not hubspot_names:
+        return {}
+    
+    chunk_size = max(1, FACILITY_MATCH_MAX_CELLS // len(hubspot_names))
+    matches = {}
+    for i in range(0, len(facility_names), chunk_size):
+        chunk = facility_names[i:i + chunk_size]
+        scores = process.cdist(chunk, hubspot_names, scorer=fuzz.ratio, score_cutoff=60, workers=-1)
+        for name, best, row_scores in zip(chunk, scores.argmax(axis=1), scores):
+            if row_scores[best] >= 60:
+                matches[name] = (hubspot_ids[best], hubspot_names[best])
+    return matches
+
+
+def _enrich_row(row, ctx):
+    """Enrich a single positional step 3 row in place and return it.
+    
+    Columns are addressed through ctx['col'] (column name -> index); the
+    enrichment columns are already present in every row. Excluded
+    corporations have already been filtered out and the job title split from
+    last_name, column-wise, by step3_enrich_csv.
+    """
+    col = ctx['col']
+    
+    # Get campaign for enrichment - include users with any campaign value
+    campaign = _cell(row, col.get('campaign'))
+    has_campaign = bool(campaign)
+    
+    # Skip matching only for users without a campaign, before any other work
+    if not has_campaign:
+        return row
+    
+    # Get email for HubSpot contact lookup
+    email = _cell(row, col.get('email')).lower()
+    
+    covr_corp = _cell(row, col.get('covr_corporation'))
+    norm_covr_corp = covr_corp.upper()
+    
+    org_map = ctx['org_map']
+    id_to_info = ctx['id_to_info']
+    org_code = _cell(row, col.get('org_code')).upper()
+    
+    task_id = ''
+    task_status = ''
+    customer_type = ''
+    services = ''
+    hubspot_url = ''
+    hubspot_corp_record_id = ''
+    hubspot_corp_name = ''
+    method = ''
+    
+    # 1. Try Manual Alias
+    alias_target = _ORG_ALIASES_UPPER.get(org_code)
+    if not task_id and alias_target:
+        task_info = org_map.get(alias_target)
+        if task_info:
+            task_id, task_status, customer_type, hubspot_url, hubspot_corp_record_id, hubspot_corp_name, services = task_info
+            method = f'alias({alias_target})'
+    
+    # 2. Try Org Code
+    if not task_id and org_code:
+        task_info = org_map.get(org_code)
+        if task_info:
+            task_id, task_status, customer_type, hubspot_url, hubspot_corp_record_id, hubspot_corp_name, services = task_info
+            method = 'org_code'
+    
+    # 3. Try Corporation Name Alias
+    alias_name = _CORP_ALIASES_UPPER.get(norm_covr_corp)
+    if not task_id and alias_name:
+        infos = ctx['norm_name_to_infos'].get(alias_name)
+        if infos:
+            cu_orig_name, cu_norm_name, cu_id, cu_status, cu_customer_type, cu_hubspot_url, cu_hubspot_corp_record_id, cu_hubspot_corp_name, cu_services = infos[0]
+            task_id = cu_id
+            task_status = cu_status
+            customer_type = cu_customer_type
+            hubspot_url = cu_hubspot_url
+            hubspot_corp_record_id = cu_hubspot_corp_record_id
+            hubspot_corp_name = cu_hubspot_corp_name
+            services = cu_services
+            method = f'name_alias({alias_name})'
+    
+    # 4. Fuzzy Name Match (substring containment, resolved in BigQuery)
+    if not task_id and norm_covr_corp in ctx['name_matches']:
+        item = id_to_info.get(ctx['name_matches'][norm_covr_corp])
+        if item:
+            cu_orig_name, cu_norm_name, cu_id, cu_status, cu_customer_type, cu_hubspot_url, cu_hubspot_corp_record_id, cu_hubspot_corp_name, cu_services = item
+            task_id = cu_id
+            task_status = cu_status
+            customer_type = cu_customer_type
+            hubspot_url = cu_hubspot_url
+            hubspot_corp_record_id = cu_hubspot_corp_record_id
+            hubspot_corp_name = cu_hubspot_corp_name
+            services = cu_services
+            method = 'name_fuzzy_match'
+    
+    # Facility matching
+    facility_task_id = ''
+    facility_task_name = ''
+    facility_corporation_task = ''
+    facility_corporation_name = ''
+    facility_hubspot_url = ''
+    facility_hubspot_record_id = ''
+    facility_hubspot_company = ''
+    
+    # Check if this is a facility-type user (has campaign and single facility)
+    facilities = _facility_name(row, col)
+    is_facility_type = bool(facilities)
+    
+    if is_facility_type:
+        i = ctx['facility_task_matches'].get(facilities)
+        if i is not None:
+            cu_orig_name, cu_norm_name, cu_id, cu_status, cu_customer_type, cu_hubspot_url, cu_hubspot_record_id, cu_hubspot_company, cu_services = ctx['name_list'][i]
+            facility_task_id = cu_id
+            facility_task_name = cu_orig_name
+            facility_hubspot_url = cu_hubspot_url
+            facility_hubspot_record_id = cu_hubspot_record_id
+            facility_hubspot_company = cu_hubspot_company
+            facility_corporation_task = task_id if task_id else ''
+        
+        if facility_corporation_task:
+            corporation_info = id_to_info.get(facility_corporation_task)
+            if corporation_info:
+                facility_corporation_name = corporation_info[0]
+    
+    # HubSpot Company Lookup for Facility Names (for all facility types)
+    if is_facility_type:
+        match = ctx['facility_hubspot_matches'].get(facilities)
+        if match:
+            facility_hubspot_record_id, facility_hubspot_company = match
+    
+    # Get HubSpot contact info (individual contact)
+    hubspot_contact = ctx['hubspot_contacts'].get(email, {})
+    
+    row[col['task_id']] = task_id
+    row[col['task_status']] = task_status
+    row[col['customer_type']] = customer_type
+    row[col['services']] = services
+    row[col['hubspot_url']] = hubspot_url
+    row[col['hubspot corporation record id']] = hubspot_corp_record_id
+    row[col['hubspot corporation name']] = hubspot_corp_name
+    row[col['facility_task_id']] = facility_task_id
+    row[col['facility_task_name']] = facility_task_name
+    row[col['facility_corporation_task']] = facility_corporation_task
+    row[col['facility_corporation_name']] = facility_corporation_name
+    row[col['facility_hubspot_url']] = facility_hubspot_url
+    row[col['facility_hubspot_record_id']] = facility_hubspot_record_id
+    row[col['facility_hubspot_company']] = facility_hubspot_company
+    row[col['hubspot_contact_id']] = hubspot_contact.get('contact_id', '')
+    row[col['hubspot_contact_first_name']] = hubspot_contact.get('first_name', '')
+    row[col['hubspot_contact_last_name']] = hubspot_contact.get('last_name', '')
+    row[col['match_method']] = method
+    
+    return row
+
+
+def _enrich_rows(rows):
+    """Enrich a chunk of step 3 rows using the worker's lookup maps, preserving order."""
+    return [_enrich_row(row, _STEP3_CONTEXT) for row in rows]
+
+
 def step3_enrich_csv():
-    """Step 3: Enrich with ClickUp and HubSpot data from BigQuery."""
+    """Step 3: Enrich with ClickUp and HubSpot data from BigQuery.
+    
+    Rows are independent once the lookup maps are built, so they are enriched
+    in chunks of STEP3_CHUNK_SIZE across STEP3_WORKERS processes. Each worker
+    receives the read-only maps once via the pool initializer, and results are
+    written back in input order.
+    
+    Returns:
+        (fieldnames, rows) of the enriched output on success, with each row a
+        list of values in fieldnames order, so step 4 can reuse it without
+        re-reading STEP3_OUTPUT; False on failure.
+    """
     logger.info("=" * 50)
     logger.info("STEP 3: Enrichment")
     logger.info("=" * 50)
@@ -860,14 +1572,51 @@ def step3_enrich_csv():
         return False
     
     try:
-        # First, collect all emails from the CSV for HubSpot contacts lookup
+        table = pq.read_table(STEP2_OUTPUT)
+        fieldnames = table.column_names
+        
+        def distinct(column):
+            return pc.unique(column).to_pylist()
+        
+        # First, collect all emails from step 2's output for HubSpot contacts
+        # lookup, and the corporation names of campaign rows for name matching.
+        # Values are normalized in Python over the distinct values only, so
+        # they match the keys _enrich_row computes.
         all_emails = set()
-        with open(STEP2_OUTPUT, mode='r', newline='', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            for row in reader:
-                email = row.get('email', '').strip()
-                if email:
-                    all_emails.add(email.lower())
+        corporations = set()
+        if 'email' in fieldnames:
+            all_emails = {e.strip().lower() for e in distinct(table['email']) if e.strip()}
+        if 'covr_corporation' in fieldnames and 'campaign' in fieldnames:
+            campaign_values = [c for c in distinct(table['campaign']) if c.strip()]
+            has_campaign = pc.is_in(table['campaign'], value_set=pa.array(campaign_values, pa.string()))
+            corporations = {c.strip().upper() for c in distinct(table['covr_corporation'].filter(has_campaign))}
+            corporations.discard('')
+        
+        # Filter excluded corporations
+        excluded_count = 0
+        if 'covr_corporation' in fieldnames:
+            excluded_values = [c for c in distinct(table['covr_corporation']) if c.strip().upper() in _EXCLUDED_UPPER]
+            if excluded_values:
+                is_excluded = pc.is_in(table['covr_corporation'], value_set=pa.array(excluded_values, pa.string()))
+                excluded_count = pc.sum(is_excluded).as_py()
+                table = table.filter(pc.invert(is_excluded))
+        
+        # Extract job title from last_name
+        if 'last_name' in fieldnames:
+            last_name = table['last_name']
+            job_title = pc.struct_field(pc.extract_regex(last_name, _JOB_TITLE_PATTERN), 'title')
+            stripped_last_name = pc.utf8_trim_whitespace(pc.replace_substring_regex(last_name, _JOB_TITLE_PATTERN, ''))
+            table = table.set_column(
+                table.column_names.index('last_name'), 'last_name',
+                pc.if_else(pc.is_null(job_title), last_name, stripped_last_name)
+            )
+            job_title = pc.fill_null(job_title, '')
+        else:
+            job_title = pa.array([''] * table.num_rows, pa.string())
+        if 'job title' in table.column_names:
+            table = table.set_column(table.column_names.index('job title'), 'job title', job_title)
+        else:
+            table = table.append_column('job title', job_title)
         
         logger.info(f"Collected {len(all_emails)} unique emails for HubSpot contact lookup")
         
@@ -880,223 +1629,115 @@ def step3_enrich_csv():
         hubspot_contacts = get_hubspot_contacts(all_emails)
         
         # Get ClickUp data - pass hubspot_companies to avoid duplicate query
-        org_map, name_list, task_map = get_clickup_maps(hubspot_companies)
+        org_map, name_list, task_map, norm_name_to_infos, id_to_info = get_clickup_maps(hubspot_companies)
         logger.info(f"Built lookup data: {len(org_map)} org codes, {len(name_list)} task names")
         
-        # Process the CSV
-        with open(STEP2_OUTPUT, mode='r', newline='', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            fieldnames = list(reader.fieldnames)
+        # Resolve fuzzy corporation name matches in a single BigQuery join
+        name_matches = get_clickup_name_matches(corporations)
+        
+        # Name matching always runs against the live task table; if it found
+        # tasks missing from a cached task snapshot, rebuild the maps live
+        if any(task_id not in id_to_info for task_id in name_matches.values()):
+            logger.info("Cached ClickUp tasks are out of date; fetching them again...")
+            org_map, name_list, task_map, norm_name_to_infos, id_to_info = get_clickup_maps(hubspot_companies, refresh=True)
+        
+        for col in ENRICHMENT_COLUMNS:
+            if col not in fieldnames:
+                fieldnames.append(col)
+        
+        # Rows are plain lists laid out as fieldnames; enrichment columns
+        # (other than the job title extracted above) start out blank
+        columns = [
+            table[name].to_pylist() if name in table.column_names and (name == 'job title' or name not in ENRICHMENT_COLUMNS)
+            else itertools.repeat('', table.num_rows)
+            for name in fieldnames
+        ]
+        rows = [list(values) for values in zip(*columns)]
+        del columns
+        
+        col = {name: i for i, name in enumerate(fieldnames)}
+        
+        # Match every distinct facility name to ClickUp tasks and HubSpot
+        # companies up front, so rows sharing a facility reuse the result
+        facility_names = {_facility_name(row, col) for row in rows}
+        facility_names.discard('')
+        norm_names = [item[1] for item in name_list]
+        norm_name_index = _build_trigram_index(norm_names)
+        facility_task_matches = {
+            name: _find_containment_match(name.upper(), norm_names, norm_name_index)
+            for name in facility_names
+        }
+        facility_hubspot_matches = _match_hubspot_facilities(facility_names, hubspot_companies)
+        
+        context = {
+            'col': col,
+            'org_map': org_map,
+            'name_list': name_list,
+            # Facility name -> index into name_list of its substring match (or None)
+            'facility_task_matches': facility_task_matches,
+            'norm_name_to_infos': norm_name_to_infos,
+            'id_to_info': id_to_info,
+            'name_matches': name_matches,
+            # Facility name -> (HubSpot record id, company name)
+            'facility_hubspot_matches': facility_hubspot_matches,
+            'hubspot_contacts': hubspot_contacts,
+        }
+        
+        total_rows = len(rows)
+        chunks = [rows[i:i + STEP3_CHUNK_SIZE] for i in range(0, total_rows, STEP3_CHUNK_SIZE)]
+        
+        with open(STEP3_OUTPUT, mode='w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER_SIZE) as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(fieldnames)
+            match_method_idx = context['col']['match_method']
             
-            # Add new columns (including services and hubspot contact info)
-            new_columns = [
-                'task_id', 'task_status', 'customer_type', 'services', 'hubspot_url',
-                'hubspot corporation record id', 'hubspot corporation name',
-                'facility_task_id', 'facility_task_name', 'facility_corporation_task',
-                'facility_corporation_name', 'facility_hubspot_url',
-                'facility_hubspot_record_id', 'facility_hubspot_company',
-                'hubspot_contact_id', 'hubspot_contact_first_name', 'hubspot_contact_last_name',
-                'match_method', 'job title'
-            ]
+            matched_org = 0
+            matched_name_fuzzy = 0
+            matched_alias = 0
+            total_count = 0
+            processed_count = 0
+            enriched_rows = []
             
-            for col in new_columns:
-                if col not in fieldnames:
-                    fieldnames.append(col)
+            # Only pay for process startup when there is more than one chunk
+            executor = None
+            if STEP3_WORKERS > 1 and len(chunks) > 1:
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=STEP3_WORKERS,
+                    initializer=_init_step3_worker,
+                    initargs=(context,)
+                )
+                enriched_chunks = executor.map(_enrich_rows, chunks)
+            else:
+                _init_step3_worker(context)
+                enriched_chunks = map(_enrich_rows, chunks)
             
-            with open(STEP3_OUTPUT, mode='w', newline='', encoding='utf-8') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                matched_org = 0
-                matched_name_fuzzy = 0
-                matched_alias = 0
-                total_count = 0
-                excluded_count = 0
-                
-                # Count total rows first for progress reporting
-                total_rows = sum(1 for _ in reader)
-                infile.seek(0)
-                reader = csv.DictReader(infile)
-                
-                for idx, row in enumerate(reader):
-                    # Progress logging every 500 rows
-                    if idx > 0 and idx % 500 == 0:
-                        logger.info(f"Step 3 progress: {idx}/{total_rows} rows processed")
-                        outfile.flush()  # Ensure progress is written to disk
-                    
-                    # Get email for HubSpot contact lookup
-                    email = row.get('email', '').strip().lower()
-                    
-                    # Extract job title from last_name
-                    last_name = row.get('last_name', '')
-                    job_match = re.search(r'\((.*?)\)', last_name)
-                    if job_match:
-                        row['job title'] = job_match.group(1)
-                        row['last_name'] = re.sub(r'\(.*?\)', '', last_name).strip()
-                    else:
-                        row['job title'] = ''
-                    
-                    covr_corp = row.get('covr_corporation', '').strip()
-                    
-                    # Filter excluded corporations
-                    if covr_corp.upper() in [ex.upper() for ex in EXCLUDED_CORPORATIONS]:
-                        excluded_count += 1
-                        continue
-                    
-                    total_count += 1
-                    user_type = row.get('View User type', '').strip()
-                    campaign = row.get('campaign', '').strip()
-                    
-                    # Get campaign for enrichment - include users with any campaign value
-                    has_campaign = bool(campaign)
-                    
-                    # Skip matching only for users without a campaign
-                    if not has_campaign:
-                        for col in new_columns:
-                            if col != 'job title':
-                                row[col] = ''
-                        writer.writerow(row)
-                        continue
-                    
-                    org_code = row.get('org_code', '').strip().upper()
-                    norm_covr_corp = covr_corp.upper()
-                    
-                    task_id = ''
-                    task_status = ''
-                    customer_type = ''
-                    services = ''
-                    hubspot_url = ''
-                    hubspot_corp_record_id = ''
-                    hubspot_corp_name = ''
-                    method = ''
-                    
-                    # 1. Try Manual Alias
-                    if not task_id and org_code in ORG_CODE_ALIASES:
-                        alias_target = ORG_CODE_ALIASES[org_code]
-                        task_info = org_map.get(alias_target)
-                        if task_info:
-                            task_id, task_status, customer_type, hubspot_url, hubspot_corp_record_id, hubspot_corp_name, services = task_info
-                            method = f'alias({alias_target})'
+            try:
+                for chunk in enriched_chunks:
+                    for row in chunk:
+                        total_count += 1
+                        method = row[match_method_idx]
+                        if method.startswith('alias('):
                             matched_alias += 1
-                    
-                    # 2. Try Org Code
-                    if not task_id and org_code:
-                        task_info = org_map.get(org_code)
-                        if task_info:
-                            task_id, task_status, customer_type, hubspot_url, hubspot_corp_record_id, hubspot_corp_name, services = task_info
-                            method = 'org_code'
+                        elif method == 'org_code':
                             matched_org += 1
-                    
-                    # 3. Try Corporation Name Alias
-                    if not task_id and norm_covr_corp in CORP_NAME_ALIASES:
-                        alias_name = CORP_NAME_ALIASES[norm_covr_corp].upper()
-                        for item in name_list:
-                            cu_orig_name, cu_norm_name, cu_id, cu_status, cu_customer_type, cu_hubspot_url, cu_hubspot_corp_record_id, cu_hubspot_corp_name, cu_services = item
-                            if cu_norm_name == alias_name:
-                                task_id = cu_id
-                                task_status = cu_status
-                                customer_type = cu_customer_type
-                                hubspot_url = cu_hubspot_url
-                                hubspot_corp_record_id = cu_hubspot_corp_record_id
-                                hubspot_corp_name = cu_hubspot_corp_name
-                                services = cu_services
-                                method = f'name_alias({alias_name})'
-                                matched_name_fuzzy += 1
-                                break
-                    
-                    # 4. Fuzzy Name Match
-                    if not task_id and norm_covr_corp:
-                        for item in name_list:
-                            cu_orig_name, cu_norm_name, cu_id, cu_status, cu_customer_type, cu_hubspot_url, cu_hubspot_corp_record_id, cu_hubspot_corp_name, cu_services = item
-                            if (norm_covr_corp in cu_norm_name) or (cu_norm_name in norm_covr_corp):
-                                task_id = cu_id
-                                task_status = cu_status
-                                customer_type = cu_customer_type
-                                hubspot_url = cu_hubspot_url
-                                hubspot_corp_record_id = cu_hubspot_corp_record_id
-                                hubspot_corp_name = cu_hubspot_corp_name
-                                services = cu_services
-                                method = 'name_fuzzy_match'
-                                matched_name_fuzzy += 1
-                                break
-                    
-                    # Facility matching
-                    facility_task_id = ''
-                    facility_task_name = ''
-                    facility_corporation_task = ''
-                    facility_corporation_name = ''
-                    facility_hubspot_url = ''
-                    facility_hubspot_record_id = ''
-                    facility_hubspot_company = ''
-                    
-                    facilities = row.get('facilities', '').strip()
-                    # Check if this is a facility-type user (has campaign and single facility)
-                    is_facility_type = campaign and 'facility' in user_type.lower() and facilities and ',' not in facilities
-                    
-                    if is_facility_type:
-                        norm_facility = facilities.upper()
-                        for item in name_list:
-                            cu_orig_name, cu_norm_name, cu_id, cu_status, cu_customer_type, cu_hubspot_url, cu_hubspot_record_id, cu_hubspot_company, cu_services = item
-                            if (norm_facility in cu_norm_name) or (cu_norm_name in norm_facility):
-                                facility_task_id = cu_id
-                                facility_task_name = cu_orig_name
-                                facility_hubspot_url = cu_hubspot_url
-                                facility_hubspot_record_id = cu_hubspot_record_id
-                                facility_hubspot_company = cu_hubspot_company
-                                facility_corporation_task = task_id if task_id else ''
-                                break
+                        elif method.startswith('name_'):
+                            matched_name_fuzzy += 1
                         
-                        if facility_corporation_task:
-                            for item in name_list:
-                                cu_orig_name, cu_norm_name, cu_id, cu_status, cu_customer_type, cu_hubspot_url, cu_hubspot_record_id, cu_hubspot_company, cu_services = item
-                                if cu_id == facility_corporation_task:
-                                    facility_corporation_name = cu_orig_name
-                                    break
-                    
-                    # HubSpot Company Lookup for Facility Names (for all facility types)
-                    if is_facility_type:
-                        facility_name = row.get('facilities', '').strip()
-                        if facility_name:
-                            hubspot_names = list(hubspot_companies.values())
-                            matches = difflib.get_close_matches(facility_name, hubspot_names, n=1, cutoff=0.6)
-                            if matches:
-                                matched_name = matches[0]
-                                for comp_id, comp_name in hubspot_companies.items():
-                                    if comp_name == matched_name:
-                                        facility_hubspot_record_id = comp_id
-                                        facility_hubspot_company = matched_name
-                                        break
-                    
-                    # Get HubSpot contact info (individual contact)
-                    hubspot_contact = hubspot_contacts.get(email, {})
-                    
-                    row['task_id'] = task_id
-                    row['task_status'] = task_status
-                    row['customer_type'] = customer_type
-                    row['services'] = services
-                    row['hubspot_url'] = hubspot_url
-                    row['hubspot corporation record id'] = hubspot_corp_record_id
-                    row['hubspot corporation name'] = hubspot_corp_name
-                    row['facility_task_id'] = facility_task_id
-                    row['facility_task_name'] = facility_task_name
-                    row['facility_corporation_task'] = facility_corporation_task
-                    row['facility_corporation_name'] = facility_corporation_name
-                    row['facility_hubspot_url'] = facility_hubspot_url
-                    row['facility_hubspot_record_id'] = facility_hubspot_record_id
-                    row['facility_hubspot_company'] = facility_hubspot_company
-                    row['hubspot_contact_id'] = hubspot_contact.get('contact_id', '')
-                    row['hubspot_contact_first_name'] = hubspot_contact.get('first_name', '')
-                    row['hubspot_contact_last_name'] = hubspot_contact.get('last_name', '')
-                    row['match_method'] = method
+                        writer.writerow(row)
+                        enriched_rows.append(row)
                     
-                    writer.writerow(row)
+                    processed_count += len(chunk)
+                    logger.info(f"Step 3 progress: {processed_count}/{total_rows} rows processed")
+            finally:
+                if executor:
+                    executor.shutdown()
         
         logger.info(f"Step 3 complete.")
         logger.info(f"Rows Processed: {total_count}, Excluded: {excluded_count}")
         logger.info(f"Matches by Alias: {matched_alias}, Org Code: {matched_org}, Fuzzy: {matched_name_fuzzy}")
         logger.info(f"HubSpot Contacts matched: {len([e for e in all_emails if e in hubspot_contacts])}")
         logger.info(f"Output: {STEP3_OUTPUT}")
-        return True
+        return fieldnames, enriched_rows
         
     except Exception as e:
         logger.error(f"Error processing CSV: {e}")
@@ -1108,13 +1749,18 @@ def step3_enrich_csv():
 # STEP 4: APPEND LOGIN DATA
 # =============================================================================
 
-def step4_append_login_data():
-    """Step 4: Append login data from the login CSV."""
+def step4_append_login_data(enriched=None):
+    """Step 4: Append login data from the login CSV.
+    
+    Args:
+        enriched: Optional (fieldnames, rows) returned by step 3 in the same run.
+            When given, the rows are used directly instead of re-reading STEP3_OUTPUT.
+    """
     logger.info("=" * 50)
     logger.info("STEP 4: Append Login Data")
     logger.info("=" * 50)
     
-    if not os.path.exists(STEP3_OUTPUT):
+    if not enriched and not os.path.exists(STEP3_OUTPUT):
         logger.error(f"Input file {STEP3_OUTPUT} not found. Run step 3 first.")
         return False
     
@@ -1138,46 +1784,63 @@ def step4_append_login_data():
         
         logger.info(f"Loaded {len(login_data)} login records (excluding totals)")
         
-        # Read enriched CSV and append login data
-        with open(STEP3_OUTPUT, mode='r', newline='', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            fieldnames = list(reader.fieldnames)
-            
-            # Add login columns if not present
-            if 'count_of_views' not in fieldnames:
-                fieldnames.append('count_of_views')
-            if 'last_login' not in fieldnames:
-                fieldnames.append('last_login')
-            
-            with open(FINAL_OUTPUT, mode='w', newline='', encoding='utf-8') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
+        # Take enriched rows from step 3 in memory, or stream them from disk
+        infile = None
+        if enriched:
+            fieldnames = list(enriched[0])
+            rows = ([value or '' for value in row] for row in enriched[1])
+        else:
+            infile = open(STEP3_OUTPUT, mode='r', newline='', encoding='utf-8')
+            rows = csv.reader(infile)
+            fieldnames = next(rows, [])
+        
+        # Add login columns if not present
+        if 'count_of_views' not in fieldnames:
+            fieldnames.append('count_of_views')
+        if 'last_login' not in fieldnames:
+            fieldnames.append('last_login')
+        
+        # Index columns once so rows are read and written positionally
+        col = {name: i for i, name in enumerate(fieldnames)}
+        email_idx = col.get('email')
+        views_idx = col['count_of_views']
+        last_login_idx = col['last_login']
+        num_cols = len(fieldnames)
+        
+        try:
+            with open(FINAL_OUTPUT, mode='w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER_SIZE) as outfile:
+                writer = csv.writer(outfile)
+                writer.writerow(fieldnames)
                 
                 matched_logins = 0
                 total_rows = 0
                 
-                # Count rows for progress
-                row_list = list(reader)
-                total_rows = len(row_list)
-                
-                for idx, row in enumerate(row_list):
+                for idx, r in enumerate(rows):
+                    total_rows += 1
                     # Progress logging every 500 rows
                     if idx > 0 and idx % 500 == 0:
-                        logger.info(f"Step 4 progress: {idx}/{total_rows} rows processed")
-                        outfile.flush()
+                        logger.info(f"Step 4 progress: {idx} rows processed")
+                    
+                    # Pad short rows so every column index is valid
+                    out = [''] * num_cols
+                    out[:len(r)] = r
                     
-                    email = row.get('email', '').strip().lower()
+                    email = out[email_idx].strip().lower() if email_idx is not None else ''
                     
-                    if email in login_data:
-                        row['count_of_views'] = login_data[email]['count_of_views']
-                        row['last_login'] = login_data[email]['last_login']
+                    login = login_data.get(email)
+                    if login:
+                        out[views_idx] = login['count_of_views']
+                        out[last_login_idx] = login['last_login']
                         matched_logins += 1
                     else:
                         # Keep empty for non-matched users
-                        row['count_of_views'] = ''
-                        row['last_login'] = ''
+                        out[views_idx] = ''
+                        out[last_login_idx] = ''
                     
-                    writer.writerow(row)
+                    writer.writerow(out)
+        finally:
+            if infile:
+                infile.close()
         
         logger.info(f"Step 4 complete.")
         logger.info(f"Total rows: {total_rows}, Matched with login data: {matched_logins}")
@@ -1200,6 +1863,8 @@ def main():
                         help='Skip API-dependent steps (step 2 - email verification)')
     parser.add_argument('--skip-bq', action='store_true',
                         help='Skip BigQuery-dependent steps (3)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Re-verify every email instead of reusing results from an existing step 2 output')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be done without executing')
     
@@ -1226,15 +1891,18 @@ def main():
             success = False
     
     if 2 in steps_to_run and success and not args.skip_api:
-        if not step2_verify_emails():
+        if not step2_verify_emails(resume=not args.no_resume):
             success = False
     
+    # Step 3 hands its enriched rows to step 4 in memory when both run
+    enriched = None
     if 3 in steps_to_run and success and not args.skip_bq:
-        if not step3_enrich_csv():
+        enriched = step3_enrich_csv()
+        if not enriched:
             success = False
     
     if 4 in steps_to_run and success:
-        if not step4_append_login_data():
+        if not step4_append_login_data(enriched):
             success = False
     
     if success:
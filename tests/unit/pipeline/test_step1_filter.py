@@ -0,0 +1,157 @@
+"""Step 1 filtering tests for process_pipeline.py.
+
+Run from the repository root with: python -m unittest discover -s tests/unit/pipeline
+"""
+
+import csv
+import os
+import random
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+import pyarrow.parquet as pq
+
+import process_pipeline as pp
+
+
+VIEW_CLINICAL = {'VC1', 'VC2', 'BOTH'}
+QRM_CADENCE = {'QR1', 'BOTH'}
+OTHER_ACTIVE = {'OA1'}
+IN_IMPLEMENTATION = {'IM1', 'LOSE'}
+LOSING_ACCESS_QRM = {'LOSE'}
+CORPORATE_CADENCE_LABOR = {'LAB1'}
+ORG_CODE_SETS = (VIEW_CLINICAL, QRM_CADENCE, OTHER_ACTIVE, IN_IMPLEMENTATION, LOSING_ACCESS_QRM, CORPORATE_CADENCE_LABOR)
+
+
+def reference_filter(rows):
+    """The original row-by-row step 1 loop, returning (kept rows, removed internal, removed org)."""
+    active_org_codes = set().union(*ORG_CODE_SETS)
+    kept = []
+    removed_internal = 0
+    removed_org = 0
+    for row in rows:
+        org_code = row.get('org_code', '').strip().upper()
+        email = row.get('email', '').strip().lower()
+        email_domain = email.split('@')[1] if '@' in email else ''
+
+        campaign = ''
+        if org_code in LOSING_ACCESS_QRM:
+            campaign = "Losing access to QRM reports"
+        elif org_code in CORPORATE_CADENCE_LABOR:
+            campaign = "customers who pay for labor reports (Selling Flow)"
+        elif org_code in VIEW_CLINICAL:
+            campaign = "View Clinical customers NOT using Labor (Labor + Flow expansion)"
+        elif org_code in QRM_CADENCE:
+            campaign = "Corporate Cadence for QRM MDS customers (Selling View labor expansion + Flow)"
+        elif org_code in IN_IMPLEMENTATION:
+            campaign = "In Implementation"
+        elif org_code in OTHER_ACTIVE:
+            campaign = "Other Active"
+
+        if campaign:
+            facilities = row.get('facilities', '').strip()
+            if not facilities or ',' in facilities:
+                view_user_type = f"{campaign} - Corp"
+            else:
+                view_user_type = f"{campaign} - facility"
+        else:
+            view_user_type = "View - No Labor"
+
+        if email_domain in pp.INTERNAL_EMAIL_DOMAINS:
+            removed_internal += 1
+            continue
+        if not (org_code == '' or org_code in active_org_codes):
+            removed_org += 1
+            continue
+        kept.append(dict(row, **{'View User type': view_user_type, 'campaign': campaign}))
+    return kept, removed_internal, removed_org
+
+
+def random_rows(count, seed):
+    rng = random.Random(seed)
+    org_codes = sorted(set().union(*ORG_CODE_SETS)) + ['', 'NEX', 'ZZZ', ' vc1 ', 'lose', 'Oa1']
+    locals_ = ['jane', 'John.Doe', 'a', '']
+    domains = ['example.com', 'qrmhealth.com', 'QRMHEALTH.COM', 'covr.care', 'Covr.Care ', 'dataiqbi.com', 'other.org', '']
+    facilities = ['', 'Oak Manor', 'Oak Manor, Pine Ridge', '  Pine Ridge  ', ',']
+    rows = []
+    for i in range(count):
+        email = rng.choice(locals_) + rng.choice(['@', '@', '@', '', '@x@']) + rng.choice(domains)
+        rows.append({
+            'email': rng.choice(['', ' ']) + email,
+            'org_code': rng.choice(org_codes),
+            'facilities': rng.choice(facilities),
+            'name': f'User {i}',
+        })
+    return rows
+
+
+class Step1FilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        patcher = mock.patch.object(pp, 'get_org_codes_from_clickup', return_value=ORG_CODE_SETS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_step1(self, rows):
+        with open(pp.INPUT_FILE, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        with self.assertLogs(pp.logger, 'INFO') as logs:
+            self.assertTrue(pp.step1_filter_rows())
+        counts = {}
+        for line in logs.output:
+            match = re.search(r'Rows (kept|removed \(internal email\)|removed \(excluded org\)): (\d+)', line)
+            if match:
+                counts[match.group(1)] = int(match.group(2))
+        return pq.read_table(pp.STEP1_OUTPUT).to_pylist(), counts
+
+    def test_matches_row_by_row_filter(self):
+        rows = random_rows(2000, seed=1)
+        expected, removed_internal, removed_org = reference_filter(rows)
+
+        kept, counts = self.run_step1(rows)
+
+        self.assertEqual(kept, expected)
+        self.assertEqual(counts, {
+            'kept': len(expected),
+            'removed (internal email)': removed_internal,
+            'removed (excluded org)': removed_org,
+        })
+
+    def test_internal_domain_is_case_insensitive(self):
+        rows = [
+            {'email': 'a@QRMHealth.com', 'org_code': 'VC1', 'facilities': ''},
+            {'email': 'b@example.com', 'org_code': 'VC1', 'facilities': 'Oak Manor'},
+        ]
+        kept, counts = self.run_step1(rows)
+
+        self.assertEqual([row['email'] for row in kept], ['b@example.com'])
+        self.assertEqual(kept[0]['View User type'], "View Clinical customers NOT using Labor (Labor + Flow expansion) - facility")
+        self.assertEqual(counts['removed (internal email)'], 1)
+
+    def test_campaign_priority_for_codes_in_several_sets(self):
+        rows = [
+            {'email': 'a@example.com', 'org_code': 'both', 'facilities': 'A, B'},
+            {'email': 'b@example.com', 'org_code': 'LOSE', 'facilities': ''},
+        ]
+        kept, _ = self.run_step1(rows)
+
+        self.assertEqual([row['campaign'] for row in kept], [
+            "View Clinical customers NOT using Labor (Labor + Flow expansion)",
+            "Losing access to QRM reports",
+        ])
+        self.assertEqual(kept[0]['View User type'], "View Clinical customers NOT using Labor (Labor + Flow expansion) - Corp")
+
+
+if __name__ == '__main__':
+    unittest.main()
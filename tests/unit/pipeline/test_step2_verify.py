@@ -0,0 +1,178 @@
+"""Step 2 email verification tests for process_pipeline.py.
+
+Run from the repository root with: python -m unittest discover -s tests/unit/pipeline
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import process_pipeline as pp
+
+
+def api_response(email):
+    """A deterministic stand-in for the validator's answer for email."""
+    score = sum(map(ord, email)) % 100
+    return {
+        'status': 'VALID' if score >= 50 else 'INVALID',
+        'score': score,
+        'validations': {'syntax': True, 'domain_exists': True, 'mx_records': score % 2 == 0,
+                        'is_disposable': False, 'is_role_based': email.startswith('info@')},
+    }
+
+
+class FakeBatchAPI:
+    """Replaces verify_email_batch_async, recording every email sent."""
+
+    def __init__(self, failing=()):
+        self.sent = []
+        self.failing = set(failing)
+
+    async def __call__(self, session, sem, emails):
+        self.sent.extend(emails)
+        results = []
+        for email in emails:
+            if email in self.failing:
+                results.append(pp._failed_validation('TIMEOUT', 'Request timed out'))
+            else:
+                results.append(pp._validation_result(api_response(email)))
+        return results
+
+
+def expected_values(email):
+    """The row-by-row result: the validator's response mapped onto VALIDATION_COLUMNS."""
+    if not email:
+        return [''] * len(pp.VALIDATION_COLUMNS)
+    if '@' not in email or email.count('@') > 1 or email.startswith('@') or email.endswith('@'):
+        response = pp._INVALID_FORMAT_RESPONSE
+    else:
+        response = api_response(email)
+    return [pp._as_text(v) for v in pp._validation_result(response).values()]
+
+
+EMAILS = [
+    'jane@example.com', 'john@example.com', 'jane@example.com', '', 'info@acme.org',
+    'not-an-email', 'two@@example.com', '@example.com', 'bob@', 'x@y.io',
+] + [f'user{i}@example.com' for i in range(40)]
+
+
+class Step2VerifyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        for name, value in (('STEP2_CHUNK_SIZE', 7), ('VALIDATION_BATCH_SIZE', 3)):
+            patcher = mock.patch.object(pp, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        pq.write_table(pa.table({
+            'name': [f'Row {i}' for i in range(len(EMAILS))],
+            'email': EMAILS,
+        }), pp.STEP1_OUTPUT)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_step2(self, api, resume=True):
+        with mock.patch.object(pp, 'verify_email_batch_async', api), self.assertLogs(pp.logger, 'INFO'):
+            return pp.step2_verify_emails(resume=resume)
+
+    def output_rows(self):
+        table = pq.read_table(pp.STEP2_OUTPUT)
+        return list(zip(table['email'].to_pylist(), zip(*(table[f].to_pylist() for f in pp.VALIDATION_COLUMNS))))
+
+    def test_output_matches_row_by_row_results(self):
+        api = FakeBatchAPI()
+        self.assertTrue(self.run_step2(api))
+
+        rows = self.output_rows()
+        self.assertEqual([email for email, _ in rows], EMAILS)
+        for email, values in rows:
+            self.assertEqual(list(values), expected_values(email), email)
+        # Each well-formed address is sent once; malformed ones never are
+        self.assertEqual(sorted(api.sent), sorted({e for e in EMAILS if expected_values(e)[0] not in ('', 'INVALID_FORMAT')}))
+
+    def test_resume_skips_verified_emails(self):
+        self.assertTrue(self.run_step2(FakeBatchAPI()))
+        first = self.output_rows()
+
+        api = FakeBatchAPI()
+        self.assertTrue(self.run_step2(api))
+
+        self.assertEqual(api.sent, [])
+        self.assertEqual(self.output_rows(), first)
+
+    def test_resume_retries_failed_emails_only(self):
+        self.assertTrue(self.run_step2(FakeBatchAPI(failing={'user3@example.com', 'x@y.io'})))
+
+        api = FakeBatchAPI()
+        self.assertTrue(self.run_step2(api))
+
+        self.assertEqual(sorted(api.sent), ['user3@example.com', 'x@y.io'])
+
+    def test_no_resume_verifies_everything_again(self):
+        self.assertTrue(self.run_step2(FakeBatchAPI()))
+
+        api = FakeBatchAPI()
+        self.assertTrue(self.run_step2(api, resume=False))
+
+        self.assertEqual(len(api.sent), len({e for e in EMAILS if expected_values(e)[0] not in ('', 'INVALID_FORMAT')}))
+
+    def test_repeated_failures_keep_earlier_results(self):
+        all_sent = []
+        # Each run reads from the start and crashes a few chunks further in
+        for crash_after_chunks in (2, 4):
+            api = FakeBatchAPI()
+            original = pp._verify_rows_async
+
+            async def failing_verify(reader, *args, budget=[crash_after_chunks * pp.STEP2_CHUNK_SIZE]):
+                def limited():
+                    for row in reader:
+                        if budget[0] == 0:
+                            raise RuntimeError('simulated crash')
+                        budget[0] -= 1
+                        yield row
+                return await original(limited(), *args)
+
+            with mock.patch.object(pp, '_verify_rows_async', failing_verify):
+                self.assertFalse(self.run_step2(api))
+            self.assertTrue(api.sent)
+            all_sent += api.sent
+            # The output stays readable and lists every input row
+            self.assertEqual([email for email, _ in self.output_rows()], EMAILS)
+
+        api = FakeBatchAPI()
+        self.assertTrue(self.run_step2(api))
+        all_sent += api.sent
+
+        # No address was sent twice across the interrupted runs
+        self.assertEqual(len(all_sent), len(set(all_sent)))
+        for email, values in self.output_rows():
+            self.assertEqual(list(values), expected_values(email), email)
+        self.assertFalse(os.path.exists(f"{pp.STEP2_OUTPUT}.tmp"))
+
+    def test_interrupted_run_leaves_previous_output(self):
+        self.assertTrue(self.run_step2(FakeBatchAPI()))
+        with open(pp.STEP2_OUTPUT, 'rb') as f:
+            previous = f.read()
+
+        async def killed(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        with mock.patch.object(pp, '_verify_rows_async', killed), self.assertRaises(KeyboardInterrupt), \
+                self.assertLogs(pp.logger, 'INFO'):
+            pp.step2_verify_emails(resume=False)
+
+        with open(pp.STEP2_OUTPUT, 'rb') as f:
+            self.assertEqual(f.read(), previous)
+        self.assertFalse(os.path.exists(f"{pp.STEP2_OUTPUT}.tmp"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""Step 3 corporation and facility matching tests for process_pipeline.py.
+
+Run from the repository root with: python -m unittest discover -s tests/unit/pipeline
+"""
+
+import random
+import unittest
+
+from rapidfuzz import fuzz, process
+
+import process_pipeline as pp
+
+
+def random_names(rng, count, words):
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(1, 3))).upper() for _ in range(count)]
+
+
+WORDS = ['OAK', 'PINE', 'MANOR', 'CARE', 'HEALTH', 'RIDGE', 'AT', 'OF', 'ST', 'A', 'SENIOR', 'LIVING', 'VALLEY']
+
+
+class ContainmentIndexTest(unittest.TestCase):
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        # Include names and queries shorter than a trigram
+        names = random_names(rng, 400, WORDS) + ['AT', 'A', 'OF A']
+        rng.shuffle(names)
+        queries = random_names(rng, 600, WORDS) + ['A', 'AT', 'OF', 'XYZ', 'OAK MANOR OF PINE RIDGE']
+        index = pp._build_trigram_index(names)
+
+        for query in queries:
+            expected = next((i for i, name in enumerate(names) if query in name or name in query), None)
+            self.assertEqual(pp._find_containment_match(query, names, index), expected, query)
+
+    def test_no_names(self):
+        self.assertIsNone(pp._find_containment_match('OAK', [], pp._build_trigram_index([])))
+
+
+class HubSpotFacilityMatchTest(unittest.TestCase):
+
+    def test_matches_extract_one_per_name(self):
+        rng = random.Random(11)
+        words = [w.title() for w in WORDS]
+        companies = {str(1000 + i): ' '.join(rng.choice(words) for _ in range(rng.randint(1, 3))) for i in range(300)}
+        facilities = {' '.join(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(500)}
+
+        expected = {}
+        ids, names = list(companies), list(companies.values())
+        for facility in facilities:
+            match = process.extractOne(facility, names, scorer=fuzz.ratio, score_cutoff=60)
+            if match:
+                expected[facility] = (ids[match[2]], match[0])
+
+        self.assertEqual(pp._match_hubspot_facilities(facilities, companies), expected)
+
+    def test_chunking_does_not_change_matches(self):
+        rng = random.Random(5)
+        companies = {str(i): name.title() for i, name in enumerate(random_names(rng, 200, WORDS))}
+        facilities = set(name.title() for name in random_names(rng, 300, WORDS))
+
+        expected = pp._match_hubspot_facilities(facilities, companies)
+        original = pp.FACILITY_MATCH_MAX_CELLS
+        pp.FACILITY_MATCH_MAX_CELLS = 500
+        try:
+            self.assertEqual(pp._match_hubspot_facilities(facilities, companies), expected)
+        finally:
+            pp.FACILITY_MATCH_MAX_CELLS = original
+
+    def test_pinned_matches(self):
+        companies = {'1': 'Oak Manor East', '2': 'Oak Manor West', '3': 'Cedar Pine Grove', '4': 'Pine Valley Care'}
+        facilities = ['Oak Manor', 'Cedar Nursing Home', 'Pine Valley', 'Maple Grove Health']
+
+        # difflib.get_close_matches picked 'Oak Manor West' for the tie and
+        # rejected 'Cedar Nursing Home' (ratio 0.53); fuzz.ratio scores it 64.7
+        self.assertEqual(pp._match_hubspot_facilities(facilities, companies), {
+            'Oak Manor': ('1', 'Oak Manor East'),
+            'Cedar Nursing Home': ('3', 'Cedar Pine Grove'),
+            'Pine Valley': ('4', 'Pine Valley Care'),
+        })
+
+    def test_empty_inputs(self):
+        self.assertEqual(pp._match_hubspot_facilities([], {'1': 'Oak Manor'}), {})
+        self.assertEqual(pp._match_hubspot_facilities(['Oak Manor'], {}), {})
+
+
+def task_info(task_id, name):
+    """A name_list entry: (original_name, norm_name, task_id, status, customer_type,
+    hubspot_url, hubspot_record_id, hubspot_company, services)."""
+    return (name, name.upper(), task_id, 'active', 'View', f'https://hubspot/company/{task_id}',
+            f'rec-{task_id}', f'{name} Inc', 'QRM')
+
+
+FIELDNAMES = ['email', 'org_code', 'covr_corporation', 'facilities', 'View User type', 'campaign'] + pp.ENRICHMENT_COLUMNS
+
+
+def make_context(facilities=()):
+    name_list = [
+        task_info('t1', 'Alpha Health'),
+        task_info('t2', 'CCS Group'),
+        task_info('t3', 'Vivage Management'),
+        task_info('t4', 'Oak Manor'),
+    ]
+    # org_map values are (task_id, status, customer_type, hubspot_url, record_id, company, services)
+    org_map = {
+        'ABC': name_list[0][2:],
+        'CCS': name_list[1][2:],
+    }
+    id_to_info = {info[2]: info for info in name_list}
+    norm_name_to_infos = {}
+    for info in name_list:
+        norm_name_to_infos.setdefault(info[1], []).append(info)
+    norm_names = [info[1] for info in name_list]
+    index = pp._build_trigram_index(norm_names)
+    return {
+        'col': {name: i for i, name in enumerate(FIELDNAMES)},
+        'org_map': org_map,
+        'name_list': name_list,
+        'facility_task_matches': {f: pp._find_containment_match(f.upper(), norm_names, index) for f in facilities},
+        'norm_name_to_infos': norm_name_to_infos,
+        'id_to_info': id_to_info,
+        'name_matches': {'ALPHA': 't1'},
+        'facility_hubspot_matches': pp._match_hubspot_facilities(facilities, {'501': 'Oak Manor Care', '502': 'Pine Ridge'}),
+        'hubspot_contacts': {'jane@example.com': {'contact_id': 'c1', 'first_name': 'Jane', 'last_name': 'Doe'}},
+    }
+
+
+def enrich(ctx, **values):
+    row = [values.get(name, '') for name in FIELDNAMES]
+    pp._enrich_row(row, ctx)
+    return dict(zip(FIELDNAMES, row))
+
+
+class EnrichRowTest(unittest.TestCase):
+
+    def test_corporation_match_methods(self):
+        ctx = make_context()
+        cases = [
+            # Org code alias wins over everything else
+            (dict(org_code='phgus', covr_corporation='Alpha'), 't2', 'alias(CCS)'),
+            (dict(org_code=' abc ', covr_corporation='Vivage'), 't1', 'org_code'),
+            (dict(org_code='ZZZ', covr_corporation=' vivage '), 't3', 'name_alias(VIVAGE MANAGEMENT)'),
+            (dict(org_code='', covr_corporation='Alpha'), 't1', 'name_fuzzy_match'),
+            (dict(org_code='ZZZ', covr_corporation='Unknown Corp'), '', ''),
+        ]
+        for values, task_id, method in cases:
+            row = enrich(ctx, campaign='Other Active', **values)
+            self.assertEqual((row['task_id'], row['match_method']), (task_id, method), values)
+            if task_id:
+                info = ctx['id_to_info'][task_id]
+                self.assertEqual(
+                    (row['task_status'], row['customer_type'], row['hubspot_url'],
+                     row['hubspot corporation record id'], row['hubspot corporation name'], row['services']),
+                    info[3:9]
+                )
+
+    def test_rows_without_campaign_are_not_enriched(self):
+        row = enrich(make_context(), org_code='ABC', email='jane@example.com', **{'job title': 'Administrator'})
+
+        self.assertEqual(row['job title'], 'Administrator')
+        self.assertTrue(all(row[col] == '' for col in pp.ENRICHMENT_COLUMNS if col != 'job title'))
+
+    def test_facility_matching(self):
+        ctx = make_context(facilities={'Oak Manor'})
+        row = enrich(ctx, org_code='ABC', campaign='Other Active', facilities=' Oak Manor ',
+                     email='JANE@example.com', **{'View User type': 'Other Active - facility'})
+
+        self.assertEqual(row['facility_task_id'], 't4')
+        self.assertEqual(row['facility_task_name'], 'Oak Manor')
+        self.assertEqual(row['facility_corporation_task'], 't1')
+        self.assertEqual(row['facility_corporation_name'], 'Alpha Health')
+        self.assertEqual(row['facility_hubspot_url'], 'https://hubspot/company/t4')
+        # The HubSpot company lookup overrides the task's HubSpot company
+        self.assertEqual((row['facility_hubspot_record_id'], row['facility_hubspot_company']), ('501', 'Oak Manor Care'))
+        self.assertEqual(
+            (row['hubspot_contact_id'], row['hubspot_contact_first_name'], row['hubspot_contact_last_name']),
+            ('c1', 'Jane', 'Doe')
+        )
+
+    def test_corp_users_skip_facility_matching(self):
+        ctx = make_context(facilities={'Oak Manor'})
+        for user_type, facilities in (('Other Active - Corp', 'Oak Manor'), ('Other Active - facility', 'Oak Manor, Pine Ridge')):
+            row = enrich(ctx, org_code='ABC', campaign='Other Active', facilities=facilities,
+                         **{'View User type': user_type})
+            self.assertEqual(row['facility_task_id'], '')
+            self.assertEqual(row['facility_hubspot_record_id'], '')
+
+
+if __name__ == '__main__':
+    unittest.main()